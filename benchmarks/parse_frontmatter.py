@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import re
+import sys
+import timeit
+
+from doctrace.core.config import MetadataConfig
+from doctrace.core.docs import LIST_ITEM_YAML, SCALAR_FIELD, RefEntry, _parse_frontmatter
+
+DOC_COUNT = 10_000
+REPEAT = 5
+
+
+def _build_frontmatter(i: int) -> list[tuple[int, str]]:
+    lines = [f"title: Doc {i}", f"description: generated doc {i}", "required_docs:"]
+    lines += [f"  - docs/dep{j}.md: dependency {j}" for j in range(3)]
+    lines.append("related_docs:")
+    lines += [f"  - docs/rel{j}.md: related {j}" for j in range(4)]
+    lines.append("sources:")
+    lines += [f"  - src/module{j}.py: module {j}" for j in range(8)]
+    return [(n + 2, line) for n, line in enumerate(lines)]
+
+
+def _legacy_extract_section(lines: list[tuple[int, str]], header_pattern: re.Pattern[str]) -> list[RefEntry]:
+    entries = []
+    in_section = False
+    for line_num, line in lines:
+        if header_pattern.match(line):
+            in_section = True
+            continue
+        if in_section:
+            if not line.strip():
+                continue
+            if line.strip().startswith("-"):
+                match = LIST_ITEM_YAML.match(line)
+                if match:
+                    entries.append(RefEntry(match.group(1).strip(), (match.group(2) or "").strip(), line_num))
+            else:
+                break
+    return entries
+
+
+def _legacy_extract_scalars(lines: list[tuple[int, str]]) -> tuple[str, str]:
+    title = ""
+    description = ""
+    for _, line in lines:
+        match = SCALAR_FIELD.match(line)
+        if match:
+            key = match.group(1).lower()
+            if key == "title":
+                title = match.group(2).strip()
+            elif key == "description":
+                description = match.group(2).strip()
+            if title and description:
+                break
+    return title, description
+
+
+def _legacy_parse(lines: list[tuple[int, str]], config: MetadataConfig) -> None:
+    for key in (config.required_docs_key, config.related_docs_key, config.sources_key):
+        _legacy_extract_section(lines, re.compile(rf"^{re.escape(key)}:\s*$", re.IGNORECASE))
+    _legacy_extract_scalars(lines)
+
+
+def main() -> int:
+    config = MetadataConfig({})
+    docs = [_build_frontmatter(i) for i in range(DOC_COUNT)]
+    legacy = min(timeit.repeat(lambda: [_legacy_parse(d, config) for d in docs], number=1, repeat=REPEAT))
+    single = min(timeit.repeat(lambda: [_parse_frontmatter(d, config) for d in docs], number=1, repeat=REPEAT))
+    print(f"docs: {DOC_COUNT}")
+    print(f"multi-pass:  {legacy * 1000:8.1f} ms")
+    print(f"single-pass: {single * 1000:8.1f} ms")
+    print(f"speedup:     {legacy / single:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
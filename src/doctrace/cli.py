@@ -8,6 +8,14 @@ from doctrace.commands import affected, completion, index, info, init, preview
 from doctrace.core.constants import DEFAULT_PREVIEW_PORT
 
 VERSION = version("doctrace")
+JOBS_HELP = "parallel parse workers (default: CPU count on large doc trees)"
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError("must be greater than 0")
+    return number
 
 
 def main():
@@ -19,6 +27,7 @@ def main():
     info_parser.add_argument("path", type=Path, help="docs directory")
     info_parser.add_argument("--json", action="store_true", help="output as JSON")
     info_parser.add_argument("--ignore", action="append", default=[], help="ignore file pattern for inline refs")
+    info_parser.add_argument("--jobs", type=_positive_int, help=JOBS_HELP)
 
     affected_parser = subparsers.add_parser("affected", help=COMMANDS["affected"]["desc"])
     affected_parser.add_argument("path", type=Path, help="docs directory")
@@ -28,16 +37,20 @@ def main():
     scope_group.add_argument("--since", help="compare from git ref (commit/tag/branch)")
     affected_parser.add_argument("--json", action="store_true", help="output as JSON")
     affected_parser.add_argument("--ignore", action="append", default=[], help="ignore file pattern")
+    affected_parser.add_argument("--jobs", type=_positive_int, help=JOBS_HELP)
 
     preview_parser = subparsers.add_parser("preview", help=COMMANDS["preview"]["desc"])
     preview_parser.add_argument("path", type=Path, help="docs directory")
     preview_parser.add_argument("--port", type=int, default=DEFAULT_PREVIEW_PORT, help="server port")
+    preview_parser.add_argument("--jobs", type=_positive_int, help=JOBS_HELP)
+    preview_parser.add_argument("--watch", action="store_true", help="rebuild the graph when docs change")
 
     subparsers.add_parser("init", help=COMMANDS["init"]["desc"])
 
     index_parser = subparsers.add_parser("index", help=COMMANDS["index"]["desc"])
     index_parser.add_argument("path", type=Path, help="docs directory")
     index_parser.add_argument("-o", "--output", type=Path, required=True, help="output file")
+    index_parser.add_argument("--jobs", type=_positive_int, help=JOBS_HELP)
 
     completion_parser = subparsers.add_parser("completion", help=COMMANDS["completion"]["desc"])
     completion_parser.add_argument("shell", nargs="?", help="shell type (zsh, bash, fish)")
@@ -49,7 +62,7 @@ def main():
         sys.exit(0)
 
     if args.command == "info":
-        sys.exit(info.run(args.path, args.json, args.ignore))
+        sys.exit(info.run(args.path, args.json, args.ignore, args.jobs))
     elif args.command == "affected":
         sys.exit(
             affected.run(
@@ -59,14 +72,15 @@ def main():
                 args.since,
                 args.json,
                 args.ignore,
+                args.jobs,
             )
         )
     elif args.command == "preview":
-        sys.exit(preview.run(args.path, args.port))
+        sys.exit(preview.run(args.path, args.port, args.jobs, args.watch))
     elif args.command == "init":
         sys.exit(init.run())
     elif args.command == "index":
-        sys.exit(index.run(args.path, args.output))
+        sys.exit(index.run(args.path, args.output, args.jobs))
     elif args.command == "completion":
         sys.exit(completion.run(args.shell))
 
@@ -14,19 +14,19 @@ COMMANDS: dict[str, CommandInfo] = {
     "info": {
         "desc": "show docs phases and warnings",
         "args": "<path>",
-        "flags": ["--json", "--ignore"],
+        "flags": ["--json", "--ignore", "--jobs"],
         "subcommands": [],
     },
     "affected": {
         "desc": "list docs affected by git diff",
         "args": "<path>",
-        "flags": ["--last", "--base-branch", "--since", "--json", "--ignore"],
+        "flags": ["--last", "--base-branch", "--since", "--json", "--ignore", "--jobs"],
         "subcommands": [],
     },
     "preview": {
         "desc": "interactive docs explorer in browser",
         "args": "<path>",
-        "flags": ["--port"],
+        "flags": ["--port", "--jobs", "--watch"],
         "subcommands": [],
     },
     "init": {
@@ -38,7 +38,7 @@ COMMANDS: dict[str, CommandInfo] = {
     "index": {
         "desc": "generate index.md from frontmatter",
         "args": "<path> -o <file>",
-        "flags": ["-o", "--output"],
+        "flags": ["-o", "--output", "--jobs"],
         "subcommands": [],
     },
     "completion": {
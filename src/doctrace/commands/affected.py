@@ -8,23 +8,23 @@ from typing import Any, NamedTuple
 
 from doctrace.core.config import Config, find_repo_root, load_config
 from doctrace.core.docs import ParsedDoc, build_doc_index, compute_levels, parse_doc
-from doctrace.core.filtering import matches_ignore_pattern
+from doctrace.core.filtering import compile_ignore_patterns
 from doctrace.core.git import (
     FileChange,
     get_changed_files,
     get_changed_files_detailed,
-    get_commits_in_range,
     get_merge_base,
-    get_merged_branches_in_range,
-    get_tags_in_range,
+    get_range_log,
 )
+from doctrace.core.graph import DocGraph
+from doctrace.core.sources import SourceIndex
 
 
 class AffectedResult(NamedTuple):
     affected_docs: list[Path]
     direct_hits: list[Path]
     indirect_hits: list[Path]
-    circular_refs: list[tuple[Path, Path]]
+    circular_refs: list[list[Path]]
     matches: dict[str, list[Path]]
     indirect_chains: dict[Path, Path]
     parsed_cache: dict[Path, ParsedDoc]
@@ -54,22 +54,27 @@ def resolve_commit_ref(
 
 
 def find_affected_docs(
-    docs_path: Path, commit_ref: str, config: Config, repo_root: Path | None = None
+    docs_path: Path, commit_ref: str, config: Config, repo_root: Path | None = None, jobs: int | None = None
 ) -> AffectedResult:
     if repo_root is None:
         repo_root = find_repo_root(docs_path)
     changed_files = get_changed_files(commit_ref, repo_root)
-    return _find_affected_docs_for_changes(docs_path, changed_files, config, repo_root)
+    return _find_affected_docs_for_changes(docs_path, changed_files, config, repo_root, jobs)
 
 
 def _find_affected_docs_for_changes(
-    docs_path: Path, changed_files: list[str], config: Config, repo_root: Path
+    docs_path: Path,
+    changed_files: list[str],
+    config: Config,
+    repo_root: Path,
+    jobs: int | None = None,
+    ignore_patterns: list[str] | None = None,
 ) -> AffectedResult:
     if not changed_files:
         return AffectedResult([], [], [], [], {}, {}, {})
-    index = build_doc_index(docs_path, config, repo_root)
-    direct_hits, matches = _find_direct_hits(changed_files, index.source_to_docs)
-    indirect_hits, circular_refs, indirect_chains = _propagate(direct_hits, index.reverse_deps)
+    index = build_doc_index(docs_path, config, repo_root, jobs=jobs, ignore_patterns=ignore_patterns)
+    direct_hits, matches = _find_direct_hits(changed_files, index.source_to_docs, index.source_index)
+    indirect_hits, circular_refs, indirect_chains = _propagate(direct_hits, index.graph.reversed())
     all_affected = list(set(direct_hits) | set(indirect_hits))
     return AffectedResult(
         affected_docs=all_affected,
@@ -83,58 +88,52 @@ def _find_affected_docs_for_changes(
 
 
 def _find_direct_hits(
-    changed_files: list[str], source_to_docs: dict[str, list[Path]]
+    changed_files: list[str], source_to_docs: dict[str, list[Path]], source_index: SourceIndex | None = None
 ) -> tuple[list[Path], dict[str, list[Path]]]:
+    if source_index is None:
+        source_index = SourceIndex(source_to_docs)
     hits = []
     matches: dict[str, list[Path]] = defaultdict(list)
     for changed in changed_files:
-        if changed in source_to_docs:
-            hits.extend(source_to_docs[changed])
-            matches[changed].extend(source_to_docs[changed])
-        for source_ref, docs in source_to_docs.items():
-            if source_ref.endswith("/") and changed.startswith(source_ref):
-                hits.extend(docs)
-                matches[source_ref].extend(docs)
+        for source_ref in source_index.match(changed):
+            docs = source_to_docs[source_ref]
+            hits.extend(docs)
+            matches[source_ref].extend(docs)
     for key in matches:
         matches[key] = list(set(matches[key]))
     return list(set(hits)), dict(matches)
 
 
-def _propagate(
-    initial_docs: list[Path], doc_to_docs: dict[Path, list[Path]]
-) -> tuple[list[Path], list[tuple[Path, Path]], dict[Path, Path]]:
-    indirect_hits = []
-    indirect_chains: dict[Path, Path] = {}
-    visited = set(initial_docs)
-    current_level = set(initial_docs)
+def _propagate(initial_docs: list[Path], doc_graph: DocGraph) -> tuple[list[Path], list[list[Path]], dict[Path, Path]]:
+    docs = doc_graph.docs
+    indirect_hits: list[int] = []
+    indirect_chains: dict[int, int] = {}
+    visited = bytearray(len(docs))
+    current_level = [doc_graph.ids[doc] for doc in initial_docs if doc in doc_graph.ids]
+    for doc_id in current_level:
+        visited[doc_id] = 1
     while current_level:
-        next_level = set()
-        for doc in current_level:
-            for referencing_doc in doc_to_docs.get(doc, []):
-                if referencing_doc in visited:
+        next_level = []
+        for doc_id in current_level:
+            for referencing_id in doc_graph.forward(doc_id):
+                if visited[referencing_id]:
                     continue
-                visited.add(referencing_doc)
-                indirect_hits.append(referencing_doc)
-                indirect_chains[referencing_doc] = doc
-                next_level.add(referencing_doc)
+                visited[referencing_id] = 1
+                indirect_hits.append(referencing_id)
+                indirect_chains[referencing_id] = doc_id
+                next_level.append(referencing_id)
         current_level = next_level
-    circular_refs = _find_circular_refs(visited, doc_to_docs)
-    return indirect_hits, circular_refs, indirect_chains
+    circular_refs = _find_circular_refs(visited, doc_graph)
+    return (
+        [docs[doc_id] for doc_id in indirect_hits],
+        circular_refs,
+        {docs[doc_id]: docs[via_id] for doc_id, via_id in indirect_chains.items()},
+    )
 
 
-def _find_circular_refs(affected_docs: set[Path], doc_to_docs: dict[Path, list[Path]]) -> list[tuple[Path, Path]]:
-    circular = []
-    seen_pairs: set[tuple[Path, Path]] = set()
-    for doc_a in affected_docs:
-        for doc_b in doc_to_docs.get(doc_a, []):
-            if doc_b not in affected_docs:
-                continue
-            if doc_a in doc_to_docs.get(doc_b, []):
-                pair = (min(doc_a, doc_b), max(doc_a, doc_b))
-                if pair not in seen_pairs:
-                    seen_pairs.add(pair)
-                    circular.append((doc_a, doc_b))
-    return circular
+def _find_circular_refs(affected: bytearray, doc_graph: DocGraph) -> list[list[Path]]:
+    docs = doc_graph.docs
+    return [[docs[doc] for doc in cycle] for cycle in doc_graph.cycles_within(affected)]
 
 
 def _get_doc_metadata(
@@ -199,7 +198,7 @@ def _build_output_data(
         "phases": {str(i + 1): [d["path"] for d in level] for i, level in enumerate(levels)},
     }
     if result.circular_refs:
-        data["circular_refs"] = [[_rel_path(a, repo_root), _rel_path(b, repo_root)] for a, b in result.circular_refs]
+        data["circular_refs"] = [[_rel_path(doc, repo_root) for doc in cycle] for cycle in result.circular_refs]
     if git_data:
         data["git"] = git_data
     return data
@@ -211,13 +210,11 @@ def _build_git_data(
     commit_ref: str,
     repo_root: Path,
 ) -> dict[str, Any]:
-    commits = get_commits_in_range(commit_ref, repo_root)
-    tags = get_tags_in_range(commit_ref, repo_root)
-    merged_branches = get_merged_branches_in_range(commit_ref, repo_root)
+    range_log = get_range_log(commit_ref, repo_root)
     return {
-        "commits": {c.short: c.message for c in commits},
-        "tags": tags,
-        "merged_branches": merged_branches,
+        "commits": {c.short: c.message for c in range_log.commits},
+        "tags": range_log.tags,
+        "merged_branches": range_log.merged_branches,
         "changed_files": [
             {
                 "path": fc.path,
@@ -290,8 +287,8 @@ def _print_from_data(data: dict[str, Any]) -> None:
 
     if data.get("circular_refs"):
         print("\nWarning: circular refs detected:")
-        for ref in data["circular_refs"]:
-            print(f"  {ref[0]} <-> {ref[1]}")
+        for cycle in data["circular_refs"]:
+            print(f"  {_format_cycle(cycle)}")
 
     if data["phases"]:
         print(f"\nPhases ({len(data['phases'])}):")
@@ -299,10 +296,19 @@ def _print_from_data(data: dict[str, Any]) -> None:
             print(f"  {phase_num}. {', '.join(docs)}")
 
 
+def _format_cycle(cycle: list[str]) -> str:
+    if len(cycle) == 1:
+        return f"{cycle[0]} -> {cycle[0]}"
+    if len(cycle) == 2:
+        return f"{cycle[0]} <-> {cycle[1]}"
+    return f"cycle among: {', '.join(cycle)}"
+
+
 def _filter_docs(docs: list[Path], repo_root: Path, ignore_patterns: list[str]) -> list[Path]:
     if not ignore_patterns:
         return docs
-    return [d for d in docs if not matches_ignore_pattern(d, repo_root, ignore_patterns)]
+    matcher = compile_ignore_patterns(tuple(ignore_patterns))
+    return [d for d in docs if not matcher.matches_path(d, repo_root)]
 
 
 def run(
@@ -312,6 +318,7 @@ def run(
     since: str | None = None,
     output_json: bool = False,
     ignore_patterns: list[str] | None = None,
+    jobs: int | None = None,
 ) -> int:
     config = load_config()
     repo_root = find_repo_root(docs_path)
@@ -326,9 +333,9 @@ def run(
             print(f"Scope error: {e}", file=sys.stderr)
         return 2
 
-    changed_files = get_changed_files(commit_ref, repo_root)
     changed_files_detailed = get_changed_files_detailed(commit_ref, repo_root)
-    result = _find_affected_docs_for_changes(docs_path, changed_files, config, repo_root)
+    changed_files = [change.path for change in changed_files_detailed]
+    result = _find_affected_docs_for_changes(docs_path, changed_files, config, repo_root, jobs, all_ignore)
 
     filtered_direct = _filter_docs(result.direct_hits, repo_root, all_ignore)
     filtered_indirect = _filter_docs(result.indirect_hits, repo_root, all_ignore)
@@ -337,7 +344,7 @@ def run(
     filtered_all_set = filtered_direct_set | filtered_indirect_set
 
     filtered_affected = list(filtered_all_set)
-    filtered_circular = [(a, b) for a, b in result.circular_refs if a in filtered_all_set and b in filtered_all_set]
+    filtered_circular = [cycle for cycle in result.circular_refs if all(doc in filtered_all_set for doc in cycle)]
     filtered_chains = {k: v for k, v in result.indirect_chains.items() if k in filtered_indirect_set}
     filtered_matches = {src: [d for d in docs if d in filtered_direct_set] for src, docs in result.matches.items()}
     filtered_matches = {k: v for k, v in filtered_matches.items() if v}
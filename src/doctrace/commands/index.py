@@ -9,11 +9,11 @@ INDEX_MARKER = "## Documentation Index"
 TOP_LEVEL_CATEGORY = "Top-Level"
 
 
-def run(docs_path: Path, output_path: Path) -> int:
+def run(docs_path: Path, output_path: Path, jobs: int | None = None) -> int:
     config = load_config()
     repo_root = find_repo_root(docs_path)
     docs_path = docs_path.resolve()
-    index = build_doc_index(docs_path, config, repo_root)
+    index = build_doc_index(docs_path, config, repo_root, jobs=jobs)
 
     rows = _build_rows(index, docs_path, repo_root)
     table = _render_table(rows)
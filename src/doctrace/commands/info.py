@@ -8,8 +8,9 @@ from types import SimpleNamespace
 from typing import Any, Iterator
 
 from doctrace.core.config import Config, find_repo_root, load_config
-from doctrace.core.docs import ParsedDoc, RefEntry, build_dependency_tree
-from doctrace.core.filtering import matches_ignore_pattern
+from doctrace.core.docs import INLINE_REF_CHARS, ParsedDoc, RefEntry, build_dependency_tree, read_inline_refs
+from doctrace.core.filtering import compile_ignore_patterns
+from doctrace.core.sources import RepoFiles, is_glob
 
 
 @dataclass
@@ -34,71 +35,69 @@ def validate_refs(docs_path: Path, config: Config, repo_root: Path) -> Iterator[
     docs_path = docs_path.resolve()
     tree = build_dependency_tree(docs_path, config, repo_root)
     for doc_path in tree.index.parsed_cache.keys():
-        yield _check_single_doc(doc_path, repo_root, tree.index.parsed_cache[doc_path], config)
+        yield _check_single_doc(doc_path, repo_root, tree.index.parsed_cache[doc_path], config, tree.index.repo_files)
 
 
-def _check_single_doc(doc_path: Path, repo_root: Path, parsed, config: Config) -> ValidateResult:
+def _check_single_doc(
+    doc_path: Path, repo_root: Path, parsed, config: Config, repo_files: RepoFiles | None = None
+) -> ValidateResult:
+    if repo_files is None:
+        repo_files = RepoFiles(repo_root)
     result = ValidateResult(doc_path=doc_path)
     for ref in parsed.required_docs:
-        ref_path = repo_root / ref.path
-        if not ref_path.exists():
+        if not repo_files.exists(ref.path):
             result.errors.append(RefError(doc_path, ref, f"required doc not found: {ref.path}", "required"))
     for ref in parsed.related_docs:
-        ref_path = repo_root / ref.path
-        if not ref_path.exists():
+        if not repo_files.exists(ref.path):
             result.errors.append(RefError(doc_path, ref, f"related doc not found: {ref.path}", "related"))
     for ref in parsed.sources:
-        ref_path = repo_root / ref.path
-        if not ref_path.exists() and not _glob_matches(ref.path, repo_root):
+        if not repo_files.exists(ref.path) and not _glob_matches(ref.path, repo_files):
             result.errors.append(RefError(doc_path, ref, f"source not found: {ref.path}", "source"))
     return result
 
 
-def _glob_matches(pattern: str, repo_root: Path) -> bool:
-    if "*" in pattern or "?" in pattern:
-        return any(repo_root.glob(pattern))
+def _glob_matches(pattern: str, repo_files: RepoFiles) -> bool:
+    if is_glob(pattern):
+        return repo_files.glob_matches(pattern)
     return False
 
 
 def extract_inline_refs(filepath: Path, pattern: re.Pattern[str]) -> list[str]:
-    content = filepath.read_text(encoding="utf-8")
-    lines = content.splitlines()
-    if not lines or lines[0].strip() != "---":
-        body_start = 0
-    else:
-        body_start = 1
-        for i, line in enumerate(lines[1:], start=1):
-            if line.strip() == "---":
-                body_start = i + 1
-                break
-    body_lines = lines[body_start:]
-    in_code_block = False
-    filtered = []
-    for line in body_lines:
-        if line.strip().startswith("```"):
-            in_code_block = not in_code_block
-            continue
-        if not in_code_block:
-            line = re.sub(r"`[^`]+`", "", line)
-            filtered.append(line)
-    body = "\n".join(filtered)
-    return list(set(pattern.findall(body)))
+    return [ref.path for ref in read_inline_refs(filepath, pattern)]
 
 
 def find_undeclared_inline_refs(
     parsed_cache: dict[Path, ParsedDoc], repo_root: Path, docs_prefix: str, ignore_patterns: list[str]
 ) -> list[tuple[Path, str]]:
+    return [
+        (doc_path, ref.path)
+        for doc_path, ref in find_undeclared_inline_ref_entries(parsed_cache, repo_root, docs_prefix, ignore_patterns)
+    ]
+
+
+def find_undeclared_inline_ref_entries(
+    parsed_cache: dict[Path, ParsedDoc], repo_root: Path, docs_prefix: str, ignore_patterns: list[str]
+) -> list[tuple[Path, RefEntry]]:
     escaped_prefix = re.escape(docs_prefix)
-    pattern = re.compile(rf"{escaped_prefix}[a-zA-Z0-9/_.-]+\.md")
+    pattern = re.compile(rf"{escaped_prefix}[{INLINE_REF_CHARS}]+\.md")
+    use_parsed = re.fullmatch(rf"[{INLINE_REF_CHARS}]*", docs_prefix) is not None
+    matcher = compile_ignore_patterns(tuple(ignore_patterns))
     undeclared = []
     for doc_path, parsed in parsed_cache.items():
-        if matches_ignore_pattern(doc_path, repo_root, ignore_patterns):
+        if matcher.matches_path(doc_path, repo_root):
             continue
         declared = {ref.path for ref in parsed.related_docs}
         declared.update(ref.path for ref in parsed.required_docs)
-        inline_refs = extract_inline_refs(doc_path, pattern)
-        for ref in inline_refs:
-            if ref not in declared:
+        if use_parsed and parsed.inline_refs is not None:
+            inline_refs: dict[str, RefEntry] = {}
+            for candidate in parsed.inline_refs:
+                for ref in pattern.findall(candidate.path):
+                    inline_refs.setdefault(ref, candidate._replace(path=ref))
+            entries = list(inline_refs.values())
+        else:
+            entries = read_inline_refs(doc_path, pattern)
+        for ref in entries:
+            if ref.path not in declared:
                 undeclared.append((doc_path, ref))
     return undeclared
 
@@ -106,7 +105,7 @@ def find_undeclared_inline_refs(
 def _build_data(
     tree,
     errors: list[tuple[Path, RefError]],
-    undeclared_inline: list[tuple[Path, str]],
+    undeclared_inline: list[tuple[Path, RefEntry]],
     repo_root: Path,
 ) -> dict[str, Any]:
     levels: dict[str, list[dict[str, Any]]] = {}
@@ -129,6 +128,9 @@ def _build_data(
             [str(a.relative_to(repo_root)), str(b.relative_to(repo_root))] for a, b in tree.circular
         ]
 
+    if tree.cycles:
+        data["cycles"] = [[str(doc.relative_to(repo_root)) for doc in cycle] for cycle in tree.cycles]
+
     if errors:
         data["missing_refs"] = [
             {
@@ -141,7 +143,8 @@ def _build_data(
 
     if undeclared_inline:
         data["undeclared_inline_refs"] = [
-            {"doc": str(doc.relative_to(repo_root)), "ref": ref} for doc, ref in undeclared_inline
+            {"doc": str(doc.relative_to(repo_root)), "ref": ref.path, "line": ref.line_number}
+            for doc, ref in undeclared_inline
         ]
 
     total_docs = sum(len(docs) for docs in tree.levels)
@@ -151,6 +154,7 @@ def _build_data(
         "levels": len([lvl for lvl in tree.levels if lvl]),
         "max_level": max_level,
         "circular_count": len(tree.circular),
+        "cycle_count": len(tree.cycles),
         "missing_count": len(errors),
         "undeclared_inline_count": len(undeclared_inline),
     }
@@ -169,12 +173,15 @@ def _print_from_data(data: dict[str, Any]) -> None:
     print("=" * 60)
 
     _print_section_header("Circular Dependencies (required_docs)")
-    circular = data.get("circular_refs", [])
-    if circular:
+    cycles = data.get("cycles", [])
+    if cycles:
         print("ERROR: Found circular dependencies!")
-        for pair in circular:
-            print(f"  {pair[0]}")
-            print(f"    <-> {pair[1]}")
+        for cycle in cycles:
+            if len(cycle) > 2:
+                print(f"  cycle among: {', '.join(cycle)}")
+            else:
+                print(f"  {cycle[0]}")
+                print(f"    <-> {cycle[-1]}")
     else:
         print("OK: No circular dependencies found")
 
@@ -203,7 +210,7 @@ def _print_from_data(data: dict[str, Any]) -> None:
     if undeclared:
         print("ERROR: Inline refs not in related_docs:")
         for u in undeclared:
-            print(f"  {u['doc']} -> {u['ref']}")
+            print(f"  {u['doc']}:{u['line']} -> {u['ref']}")
     else:
         print("OK: All inline refs are in related_docs")
 
@@ -211,7 +218,7 @@ def _print_from_data(data: dict[str, Any]) -> None:
     s = data["summary"]
     print(f"Total docs: {s['total_docs']}")
     print(f"Levels: {s['levels']} (0 to {s['max_level']})")
-    print(f"Circular deps (required): {s['circular_count']}")
+    print(f"Circular deps (required): {s['cycle_count']}")
     print(f"Missing referenced docs: {s['missing_count']}")
     print(f"Missing inline refs: {s['undeclared_inline_count']}")
 
@@ -221,26 +228,30 @@ def _filter_parsed_cache(
 ) -> dict[Path, ParsedDoc]:
     if not ignore_patterns:
         return parsed_cache
-    return {p: d for p, d in parsed_cache.items() if not matches_ignore_pattern(p, repo_root, ignore_patterns)}
+    matcher = compile_ignore_patterns(tuple(ignore_patterns))
+    return {p: d for p, d in parsed_cache.items() if not matcher.matches_path(p, repo_root)}
 
 
-def run(docs_path: Path, output_json: bool = False, ignore_patterns: list[str] | None = None) -> int:
+def run(
+    docs_path: Path, output_json: bool = False, ignore_patterns: list[str] | None = None, jobs: int | None = None
+) -> int:
     config = load_config()
     repo_root = find_repo_root(docs_path)
     docs_path = docs_path.resolve()
-    tree = build_dependency_tree(docs_path, config, repo_root)
+    tree = build_dependency_tree(docs_path, config, repo_root, jobs, inline_refs=True)
 
     all_ignore = config.ignore_inline_refs + (ignore_patterns or [])
+
     filtered_cache = _filter_parsed_cache(tree.index.parsed_cache, repo_root, all_ignore)
 
     errors: list[tuple[Path, RefError]] = []
     for doc_path in filtered_cache.keys():
-        result = _check_single_doc(doc_path, repo_root, filtered_cache[doc_path], config)
+        result = _check_single_doc(doc_path, repo_root, filtered_cache[doc_path], config, tree.index.repo_files)
         for error in result.errors:
             errors.append((doc_path, error))
 
     docs_prefix = str(docs_path.relative_to(repo_root)) + "/"
-    undeclared_inline = find_undeclared_inline_refs(filtered_cache, repo_root, docs_prefix, [])
+    undeclared_inline = find_undeclared_inline_ref_entries(filtered_cache, repo_root, docs_prefix, [])
 
     filtered_levels = []
     for level_docs in tree.levels:
@@ -249,9 +260,12 @@ def run(docs_path: Path, output_json: bool = False, ignore_patterns: list[str] |
 
     filtered_circular = [(a, b) for a, b in tree.circular if a in filtered_cache and b in filtered_cache]
 
+    filtered_cycles = [cycle for cycle in tree.cycles if all(doc in filtered_cache for doc in cycle)]
+
     filtered_tree = SimpleNamespace(
         levels=filtered_levels,
         circular=filtered_circular,
+        cycles=filtered_cycles,
         index=SimpleNamespace(parsed_cache=filtered_cache),
     )
 
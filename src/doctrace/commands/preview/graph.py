@@ -1,45 +1,54 @@
 from __future__ import annotations
 
 import json
+import threading
+from collections import defaultdict
 from importlib.resources import files
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable
 
 from doctrace.core.config import Config
-from doctrace.core.docs import build_dependency_tree
+from doctrace.core.constants import GRAPH_MAX_DEPTH, GRAPH_PAGE_SIZE
+from doctrace.core.docs import DependencyTree, build_dependency_tree
 
 TEMPLATE_PATH = files("doctrace.commands.preview").joinpath("template.html")
 
 
-def build_graph_data(docs_path: Path, config: Config, repo_root: Path) -> dict[str, Any]:
-    tree = build_dependency_tree(docs_path, config, repo_root)
-    nodes = []
-    edges = []
-    node_ids: dict[Path, str] = {}
-    doc_to_level: dict[Path, int] = {}
+def build_graph_data(docs_path: Path, config: Config, repo_root: Path, jobs: int | None = None) -> dict[str, Any]:
+    tree = build_dependency_tree(docs_path, config, repo_root, jobs)
+    return graph_data_from_tree(tree, repo_root)
+
+
+def graph_data_from_tree(
+    tree: DependencyTree, repo_root: Path, node_ids: dict[Path, str] | None = None
+) -> dict[str, Any]:
+    if node_ids is None:
+        node_ids = {doc: f"N{i}" for i, doc in enumerate(tree.doc_deps)}
+    graph = tree.index.graph
+    graph_node_ids = [node_ids.get(doc) for doc in graph.docs]
+    doc_levels = [0] * len(graph)
     for level_idx, level_docs in enumerate(tree.levels):
         for doc in level_docs:
-            doc_to_level[doc] = level_idx
-    for i, doc in enumerate(tree.doc_deps.keys()):
-        node_id = f"N{i}"
-        node_ids[doc] = node_id
-        rel_path = str(doc.relative_to(repo_root))
-        level = doc_to_level.get(doc, 0)
+            doc_levels[graph.ids[doc]] = level_idx
+    nodes = []
+    edges = []
+    for doc in tree.doc_deps:
+        doc_id = graph.ids[doc]
         nodes.append(
             {
-                "id": node_id,
-                "path": rel_path,
+                "id": graph_node_ids[doc_id],
+                "path": str(doc.relative_to(repo_root)),
                 "name": doc.stem,
-                "level": level,
+                "level": doc_levels[doc_id],
             }
         )
-    for doc, deps in tree.doc_deps.items():
-        for dep in deps:
-            if dep in node_ids:
+        for dep_id in graph.forward(doc_id):
+            if graph_node_ids[dep_id] is not None:
                 edges.append(
                     {
-                        "from": node_ids[dep],
-                        "to": node_ids[doc],
+                        "from": graph_node_ids[dep_id],
+                        "to": graph_node_ids[doc_id],
                     }
                 )
     for src, dst in tree.circular:
@@ -73,7 +82,131 @@ def build_graph_data(docs_path: Path, config: Config, repo_root: Path) -> dict[s
     }
 
 
-def generate_html(graph_data: dict[str, Any]) -> str:
+class GraphView:
+    def __init__(self, graph_data: dict[str, Any], version: int = 0):
+        self.version = version
+        self.levels_info: list[dict[str, Any]] = graph_data["levels"]
+        self.stats: dict[str, Any] = graph_data["stats"]
+        self.nodes: dict[str, dict[str, Any]] = {}
+        self.node_paths: dict[str, str] = {}
+        self.levels: defaultdict[int, dict[str, dict[str, Any]]] = defaultdict(dict)
+        self.incident: defaultdict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.lock = threading.Lock()
+        for node in graph_data["nodes"]:
+            self._add_node(node)
+        for edge in graph_data["edges"]:
+            self._link(edge)
+
+    def summary(self) -> dict[str, Any]:
+        with self.lock:
+            return {"levels": self.levels_info, "stats": self.stats, "version": self.version}
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                "nodes": list(self.nodes.values()),
+                "edges": [
+                    edge for node_id, edges in self.incident.items() for edge in edges if edge["from"] == node_id
+                ],
+                "levels": self.levels_info,
+                "stats": self.stats,
+            }
+
+    def apply(self, delta: dict[str, Any], version: int) -> None:
+        with self.lock:
+            for edge in delta["edges"]["removed"]:
+                self._unlink(edge)
+            for node_id in delta["nodes"]["removed"]:
+                node = self.nodes.pop(node_id)
+                del self.node_paths[node["path"]]
+                del self.levels[node["level"]][node_id]
+            for node in chain(delta["nodes"]["added"], delta["nodes"]["updated"]):
+                previous = self.nodes.get(node["id"])
+                if previous is not None:
+                    del self.levels[previous["level"]][node["id"]]
+                self._add_node(node)
+            for edge in delta["edges"]["added"]:
+                self._link(edge)
+            self.levels_info = delta["levels"]
+            self.stats = delta["stats"]
+            self.version = version
+
+    def level(self, level: int, offset: int = 0, limit: int = GRAPH_PAGE_SIZE) -> dict[str, Any]:
+        with self.lock:
+            level_nodes = self.levels.get(level, {})
+            nodes = list(islice(level_nodes.values(), offset, offset + limit))
+            return {
+                "level": level,
+                "offset": offset,
+                "total": len(level_nodes),
+                "nodes": nodes,
+                "edges": self._edges(node["id"] for node in nodes),
+                "version": self.version,
+            }
+
+    def around(self, path: str, depth: int = 1, limit: int = GRAPH_PAGE_SIZE) -> dict[str, Any] | None:
+        with self.lock:
+            start = self.node_paths.get(path)
+            if start is None:
+                return None
+            seen = {start: None}
+            frontier = [start]
+            truncated = False
+            for _ in range(min(depth, GRAPH_MAX_DEPTH)):
+                next_frontier = []
+                for node_id in frontier:
+                    for edge in self.incident.get(node_id, ()):
+                        other = edge["to"] if edge["from"] == node_id else edge["from"]
+                        if other in seen:
+                            continue
+                        if len(seen) >= limit:
+                            truncated = True
+                            break
+                        seen[other] = None
+                        next_frontier.append(other)
+                frontier = next_frontier
+                if not frontier:
+                    break
+            return {
+                "center": start,
+                "nodes": [self.nodes[node_id] for node_id in seen],
+                "edges": self._edges(seen, inner=True),
+                "truncated": truncated,
+                "version": self.version,
+            }
+
+    def _add_node(self, node: dict[str, Any]) -> None:
+        self.nodes[node["id"]] = node
+        self.node_paths[node["path"]] = node["id"]
+        self.levels[node["level"]][node["id"]] = node
+
+    def _link(self, edge: dict[str, Any]) -> None:
+        self.incident[edge["from"]].append(edge)
+        if edge["to"] != edge["from"]:
+            self.incident[edge["to"]].append(edge)
+
+    def _unlink(self, edge: dict[str, Any]) -> None:
+        for node_id in {edge["from"], edge["to"]}:
+            edges = [other for other in self.incident[node_id] if other != edge]
+            if edges:
+                self.incident[node_id] = edges
+            else:
+                del self.incident[node_id]
+
+    def _edges(self, node_ids: Iterable[str], inner: bool = False) -> list[dict[str, Any]]:
+        selected = dict.fromkeys(node_ids)
+        edges = []
+        for node_id in selected:
+            for edge in self.incident.get(node_id, ()):
+                other = edge["to"] if edge["from"] == node_id else edge["from"]
+                if other in selected:
+                    if edge["from"] == node_id:
+                        edges.append(edge)
+                elif not inner:
+                    edges.append(edge)
+        return edges
+
+
+def generate_html(watch: bool = False) -> str:
     template = TEMPLATE_PATH.read_text(encoding="utf-8")
-    graph_json = json.dumps(graph_data)
-    return template.replace('"__GRAPH_DATA__"', graph_json)
+    return template.replace('"__WATCH__"', json.dumps(watch))
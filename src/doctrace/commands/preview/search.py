@@ -1,26 +1,214 @@
 from __future__ import annotations
 
+import heapq
+import re
+import threading
+from bisect import bisect_right
+from collections import defaultdict
 from pathlib import Path
+from typing import Any, Iterable, Iterator, NamedTuple
 
-from doctrace.core.constants import MARKDOWN_GLOB
+from doctrace.core.constants import (
+    MARKDOWN_GLOB,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_MATCHES,
+    SEARCH_MIN_TOKEN,
+    SEARCH_SNIPPET_LENGTH,
+)
 
+CORPUS_SEPARATOR = "\n"
+TITLE_LINE = re.compile(r"^(?:title:[ \t]*|#[ \t]+)(\S.*)$", re.MULTILINE)
+TITLE_TIER = 2
+PATH_TIER = 1
+BODY_TIER = 0
 
-def search_docs(repo_root: Path, docs_path: Path, query: str) -> list[dict]:
-    results = []
-    query_lower = query.lower()
-    for md_file in docs_path.rglob(MARKDOWN_GLOB):
+
+class IndexedDoc(NamedTuple):
+    path: str
+    name: str
+    title: str
+    content: str
+    text: str
+    tokens: set[str]
+
+
+class Corpus(NamedTuple):
+    text: str
+    offsets: list[int]
+    keys: list[Any]
+
+
+class Headers(NamedTuple):
+    titles: Corpus
+    paths: Corpus
+
+
+class SearchIndex:
+    def __init__(self, repo_root: Path, docs_path: Path):
+        self.repo_root = repo_root
+        self.docs_path = docs_path
+        self._ids: dict[Path, int] = {}
+        self._docs: dict[int, IndexedDoc] = {}
+        self._postings: defaultdict[str, set[int]] = defaultdict(set)
+        self._vocabulary: Corpus | None = None
+        self._headers: Headers | None = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        for md_file in docs_path.rglob(MARKDOWN_GLOB):
+            self._add(md_file)
+
+    def update(self, changed: Iterable[Path], removed: Iterable[Path]) -> None:
+        with self._lock:
+            for md_file in removed:
+                self._remove(md_file)
+            for md_file in changed:
+                self._add(md_file)
+
+    def search(self, query: str, limit: int = SEARCH_DEFAULT_LIMIT, offset: int = 0) -> list[dict]:
+        query_lower = query.lower()
+        offset = max(offset, 0)
+        if not query_lower or "\n" in query_lower or limit <= 0:
+            return []
+        wanted = offset + limit
+        ranked: list[tuple[int, int, int, dict]] = []
+        seen: set[int] = set()
+        with self._lock:
+            headers = self._build_headers()
+            candidates = self._candidates(query_lower)
+            tiers = (
+                (TITLE_TIER, _scan(headers.titles, query_lower)),
+                (PATH_TIER, _scan(headers.paths, query_lower)),
+                (BODY_TIER, iter(self._docs) if candidates is None else iter(sorted(candidates))),
+            )
+            for tier, doc_ids in tiers:
+                for doc_id in doc_ids:
+                    if len(ranked) == wanted and ranked[0][:2] >= (tier, SEARCH_MAX_MATCHES):
+                        break
+                    if doc_id in seen:
+                        continue
+                    doc = self._docs[doc_id]
+                    if tier == BODY_TIER and query_lower not in doc.text:
+                        continue
+                    seen.add(doc_id)
+                    matches = _find_matches(doc, query_lower)
+                    entry = (tier, len(matches), -doc_id, {"path": doc.path, "name": doc.name, "matches": matches})
+                    if len(ranked) < wanted:
+                        heapq.heappush(ranked, entry)
+                    elif entry[:3] > ranked[0][:3]:
+                        heapq.heapreplace(ranked, entry)
+        return [entry[3] for entry in sorted(ranked, key=lambda entry: entry[:3], reverse=True)[offset:]]
+
+    def _add(self, md_file: Path) -> None:
         try:
             content = md_file.read_text(encoding="utf-8")
-            lines = content.split("\n")
-            matches = []
-            for i, line in enumerate(lines):
-                if query_lower in line.lower():
-                    matches.append({"line": i + 1, "text": line.strip()[:100]})
-                    if len(matches) >= 3:
-                        break
-            if matches:
-                rel_path = str(md_file.relative_to(repo_root))
-                results.append({"path": rel_path, "name": md_file.stem, "matches": matches})
         except (OSError, UnicodeDecodeError):
-            pass
-    return results
+            self._remove(md_file)
+            return
+        text = content.lower()
+        tokens = set(text.split())
+        title = TITLE_LINE.search(text)
+        doc_id = self._ids.get(md_file)
+        if doc_id is None:
+            doc_id = self._ids[md_file] = self._next_id
+            self._next_id += 1
+        else:
+            self._unindex(doc_id)
+        self._docs[doc_id] = IndexedDoc(
+            path=str(md_file.relative_to(self.repo_root)),
+            name=md_file.stem,
+            title=title.group(1).strip() if title else "",
+            content=content,
+            text=text,
+            tokens=tokens,
+        )
+        self._headers = None
+        postings = self._postings
+        vocabulary_size = len(postings)
+        for token in tokens:
+            postings[token].add(doc_id)
+        if len(postings) != vocabulary_size:
+            self._vocabulary = None
+
+    def _remove(self, md_file: Path) -> None:
+        doc_id = self._ids.pop(md_file, None)
+        if doc_id is not None:
+            self._unindex(doc_id)
+            del self._docs[doc_id]
+            self._headers = None
+
+    def _unindex(self, doc_id: int) -> None:
+        for token in self._docs[doc_id].tokens:
+            postings = self._postings[token]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+
+    def _build_headers(self) -> Headers:
+        if self._headers is None:
+            docs = self._docs.items()
+            self._headers = Headers(
+                titles=_build_corpus((doc.title, doc_id) for doc_id, doc in docs if doc.title),
+                paths=_build_corpus((doc.path.lower(), doc_id) for doc_id, doc in docs),
+            )
+        return self._headers
+
+    def _candidates(self, query_lower: str) -> set[int] | None:
+        candidates = None
+        for part in sorted(set(query_lower.split()), key=len, reverse=True):
+            if len(part) < SEARCH_MIN_TOKEN:
+                break
+            if self._vocabulary is None:
+                self._vocabulary = _build_corpus((token, token) for token in self._postings)
+            docs: set[int] = set()
+            for token in _scan(self._vocabulary, part):
+                docs |= self._postings[token]
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                break
+        return candidates
+
+
+def _build_corpus(entries: Iterable[tuple[str, Any]]) -> Corpus:
+    parts = []
+    offsets = []
+    keys = []
+    offset = 0
+    for part, key in entries:
+        parts.append(part)
+        offsets.append(offset)
+        keys.append(key)
+        offset += len(part) + 1
+    return Corpus(CORPUS_SEPARATOR.join(parts), offsets, keys)
+
+
+def _scan(corpus: Corpus, part: str) -> Iterator[Any]:
+    pos = corpus.text.find(part)
+    while pos != -1:
+        i = bisect_right(corpus.offsets, pos) - 1
+        yield corpus.keys[i]
+        if i + 1 == len(corpus.offsets):
+            break
+        pos = corpus.text.find(part, corpus.offsets[i + 1])
+
+
+def _find_matches(doc: IndexedDoc, query_lower: str) -> list[dict]:
+    lines = doc.content.split("\n")
+    matches = []
+    line = 0
+    line_start = 0
+    pos = doc.text.find(query_lower)
+    while pos != -1 and len(matches) < SEARCH_MAX_MATCHES:
+        line += doc.text.count("\n", line_start, pos)
+        matches.append({"line": line + 1, "text": lines[line].strip()[:SEARCH_SNIPPET_LENGTH]})
+        line_start = doc.text.find("\n", pos)
+        if line_start == -1:
+            break
+        pos = doc.text.find(query_lower, line_start)
+    return matches
+
+
+def search_docs(
+    repo_root: Path, docs_path: Path, query: str, limit: int = SEARCH_DEFAULT_LIMIT, offset: int = 0
+) -> list[dict]:
+    return SearchIndex(repo_root, docs_path).search(query, limit, offset)
@@ -1,42 +1,138 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import http.server
 import json
 import socketserver
 import threading
 import webbrowser
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
-from doctrace.commands.preview.graph import build_graph_data, generate_html
-from doctrace.commands.preview.search import search_docs
+from doctrace.commands.preview.graph import GraphView, build_graph_data, generate_html
+from doctrace.commands.preview.search import SearchIndex
+from doctrace.commands.preview.watch import DocWatcher, LiveGraph
 from doctrace.core.config import find_repo_root, load_config
-from doctrace.core.constants import DEFAULT_PREVIEW_PORT
-from doctrace.core.git import get_file_at_commit, get_file_history
+from doctrace.core.constants import (
+    DEFAULT_PREVIEW_PORT,
+    GRAPH_PAGE_SIZE,
+    GZIP_CACHE_SIZE,
+    GZIP_MIN_SIZE,
+    PREVIEW_BUSY_TIMEOUT,
+    PREVIEW_KEEPALIVE_TIMEOUT,
+    PREVIEW_MAX_STREAMS,
+    PREVIEW_MAX_WORKERS,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    SSE_HEARTBEAT_INTERVAL,
+)
+from doctrace.core.git import BlobReader, BulkHistory, get_file_history
 
 
-class ReuseAddrTCPServer(socketserver.TCPServer):
+class PreviewServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
     allow_reuse_address = True
+    daemon_threads = True
+    block_on_close = False
+
+    def __init__(
+        self,
+        server_address,
+        handler,
+        max_workers: int = PREVIEW_MAX_WORKERS,
+        max_streams: int = PREVIEW_MAX_STREAMS,
+    ):
+        self.workers = threading.BoundedSemaphore(max_workers)
+        self.streams = threading.BoundedSemaphore(max_streams)
+        super().__init__(server_address, handler)
 
 
 class PreviewHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, html_content: str, repo_root: Path, docs_path: Path, **kwargs):
+    protocol_version = "HTTP/1.1"
+    timeout = PREVIEW_KEEPALIVE_TIMEOUT
+
+    def __init__(
+        self,
+        *args,
+        html_content: bytes,
+        repo_root: Path,
+        docs_path: Path,
+        blob_reader: BlobReader,
+        bulk_history: BulkHistory,
+        search_index: SearchIndex,
+        graph_view: GraphView | None = None,
+        live_graph: LiveGraph | None = None,
+        doc_watcher: DocWatcher | None = None,
+        **kwargs,
+    ):
         self.html_content = html_content
         self.repo_root = repo_root
         self.docs_path = docs_path
+        self.blob_reader = blob_reader
+        self.bulk_history = bulk_history
+        self.search_index = search_index
+        self.graph_view = graph_view
+        self.live_graph = live_graph
+        self.doc_watcher = doc_watcher
+        self.slot: threading.BoundedSemaphore | None = None
         super().__init__(*args, **kwargs)
 
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        finally:
+            if self.slot is not None:
+                self.slot.release()
+                self.slot = None
+
+    def parse_request(self) -> bool:
+        if not super().parse_request():
+            return False
+        if not self.server.workers.acquire(timeout=PREVIEW_BUSY_TIMEOUT):
+            self._send_busy()
+            return False
+        self.slot = self.server.workers
+        return True
+
+    def _send_busy(self):
+        self.close_connection = True
+        self.send_response(503)
+        self.send_header("Retry-After", "1")
+        self.send_header("Content-Length", "0")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
     def _is_safe_path(self, doc_path: str) -> bool:
         full_path = (self.repo_root / doc_path).resolve()
         return full_path.is_relative_to(self.repo_root)
 
+    def _send_body(self, body: bytes, content_type: str):
+        etag = _etag(body)
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        use_gzip = len(body) >= GZIP_MIN_SIZE and _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        if use_gzip:
+            body = _gzip(body)
+        self.send_response(200)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
         parsed = urlparse(self.path)
         if parsed.path == "/" or parsed.path == "/index.html":
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(self.html_content.encode())
+            self._send_body(self.html_content, "text/html")
         elif parsed.path == "/doc":
             params = parse_qs(parsed.query)
             doc_path = params.get("path", [None])[0]
@@ -48,25 +144,22 @@ class PreviewHandler(http.server.SimpleHTTPRequestHandler):
                 full_path = (self.repo_root / doc_path).resolve()
                 if full_path.suffix == ".md":
                     if commit:
-                        content = get_file_at_commit(self.repo_root, doc_path, commit)
+                        content = self.blob_reader.read(doc_path, commit)
                         if content is not None:
-                            self.send_response(200)
-                            self.send_header("Content-type", "text/plain; charset=utf-8")
-                            self.end_headers()
-                            self.wfile.write(content.encode("utf-8"))
+                            self._send_body(content.encode("utf-8"), "text/plain; charset=utf-8")
                         else:
                             self.send_error(404, "Version not found")
                     elif full_path.exists():
-                        self.send_response(200)
-                        self.send_header("Content-type", "text/plain; charset=utf-8")
-                        self.end_headers()
-                        self.wfile.write(full_path.read_text(encoding="utf-8").encode("utf-8"))
+                        content = full_path.read_text(encoding="utf-8")
+                        self._send_body(content.encode("utf-8"), "text/plain; charset=utf-8")
                     else:
                         self.send_error(404, "Document not found")
                 else:
                     self.send_error(404, "Document not found")
             else:
                 self.send_error(400, "Missing path parameter")
+        elif parsed.path == "/graph":
+            self._send_graph(parse_qs(parsed.query))
         elif parsed.path == "/history":
             params = parse_qs(parsed.query)
             doc_path = params.get("path", [None])[0]
@@ -75,29 +168,68 @@ class PreviewHandler(http.server.SimpleHTTPRequestHandler):
                     self.send_error(403, "Forbidden")
                     return
                 history = get_file_history(self.repo_root, doc_path)
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps(history).encode("utf-8"))
+                self._send_body(json.dumps(history).encode("utf-8"), "application/json")
             else:
                 self.send_error(400, "Missing path parameter")
+        elif parsed.path == "/history/bulk":
+            history = self.bulk_history.get()
+            self._send_body(json.dumps(history).encode("utf-8"), "application/json")
+        elif parsed.path == "/events" and self.live_graph is not None:
+            params = parse_qs(parsed.query)
+            since = self.headers.get("Last-Event-ID") or params.get("since", ["0"])[0]
+            self._stream_events(int(since) if since.isdigit() else 0)
         elif parsed.path == "/search":
             params = parse_qs(parsed.query)
             query = params.get("q", [None])[0]
             if query and len(query) >= 2:
-                results = search_docs(self.repo_root, self.docs_path, query)
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(json.dumps(results).encode("utf-8"))
+                if self.doc_watcher is not None:
+                    self.doc_watcher.refresh()
+                limit = min(_int_param(params, "limit", SEARCH_DEFAULT_LIMIT), SEARCH_MAX_LIMIT)
+                results = self.search_index.search(query, limit, _int_param(params, "offset", 0))
+                self._send_body(json.dumps(results).encode("utf-8"), "application/json")
             else:
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.end_headers()
-                self.wfile.write(b"[]")
+                self._send_body(b"[]", "application/json")
         else:
             self.send_error(404)
 
+    def _send_graph(self, params: dict[str, list[str]]):
+        view = self.live_graph.view if self.live_graph is not None else self.graph_view
+        limit = min(_int_param(params, "limit", GRAPH_PAGE_SIZE), GRAPH_PAGE_SIZE)
+        around = params.get("around", [None])[0]
+        if around:
+            payload = view.around(around, _int_param(params, "depth", 1), limit)
+            if payload is None:
+                self.send_error(404, "Document not found")
+                return
+        elif "level" in params:
+            payload = view.level(_int_param(params, "level", 0), _int_param(params, "offset", 0), limit)
+        else:
+            payload = view.summary()
+        self._send_body(json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _stream_events(self, version: int):
+        if not self.server.streams.acquire(blocking=False):
+            self.send_error(503, "Too many event streams")
+            return
+        self.slot.release()
+        self.slot = self.server.streams
+        self.send_response(200)
+        self.send_header("Content-type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            while True:
+                events = self.live_graph.wait_events(version, SSE_HEARTBEAT_INTERVAL)
+                if not events:
+                    self.wfile.write(b": ping\n\n")
+                for name, payload in events:
+                    version = payload["version"]
+                    self.wfile.write(f"id: {version}\nevent: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
     def do_POST(self):
         parsed = urlparse(self.path)
         if parsed.path == "/doc":
@@ -112,8 +244,10 @@ class PreviewHandler(http.server.SimpleHTTPRequestHandler):
                     content_length = int(self.headers.get("Content-Length", 0))
                     body = self.rfile.read(content_length).decode("utf-8")
                     full_path.write_text(body, encoding="utf-8")
+                    self.search_index.update([full_path], [])
                     self.send_response(200)
                     self.send_header("Content-type", "application/json")
+                    self.send_header("Content-Length", "11")
                     self.end_headers()
                     self.wfile.write(b'{"ok":true}')
                 else:
@@ -127,19 +261,77 @@ class PreviewHandler(http.server.SimpleHTTPRequestHandler):
         pass
 
 
-def run(docs_path: Path, port: int = DEFAULT_PREVIEW_PORT) -> int:
+@lru_cache(maxsize=GZIP_CACHE_SIZE)
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6)
+
+
+@lru_cache(maxsize=GZIP_CACHE_SIZE)
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _int_param(params: dict[str, list[str]], name: str, default: int) -> int:
+    value = params.get(name, [""])[0]
+    return int(value) if value.isdigit() else default
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.strip().replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def run(docs_path: Path, port: int = DEFAULT_PREVIEW_PORT, jobs: int | None = None, watch: bool = False) -> int:
     config = load_config()
     docs_path = docs_path.resolve()
     repo_root = find_repo_root(docs_path)
-    graph_data = build_graph_data(docs_path, config, repo_root)
-    html_content = generate_html(graph_data)
+    watcher = DocWatcher(docs_path)
+    live_graph = None
+    graph_view = None
+    if watch:
+        live_graph = LiveGraph(docs_path, config, repo_root, jobs)
+        watcher.listeners.append(live_graph.apply)
+    else:
+        graph_view = GraphView(build_graph_data(docs_path, config, repo_root, jobs))
+    search_index = SearchIndex(repo_root, docs_path)
+    watcher.listeners.append(search_index.update)
+    stop_watch = threading.Event()
+    if watch:
+        threading.Thread(target=watcher.run, args=(stop_watch,), daemon=True).start()
+    html_content = generate_html(watch).encode("utf-8")
+    blob_reader = BlobReader(repo_root)
+    bulk_history = BulkHistory(repo_root, docs_path.relative_to(repo_root).as_posix())
 
     def handler(*args, **kwargs):
-        return PreviewHandler(*args, html_content=html_content, repo_root=repo_root, docs_path=docs_path, **kwargs)
+        return PreviewHandler(
+            *args,
+            html_content=html_content,
+            repo_root=repo_root,
+            docs_path=docs_path,
+            blob_reader=blob_reader,
+            bulk_history=bulk_history,
+            search_index=search_index,
+            graph_view=graph_view,
+            live_graph=live_graph,
+            doc_watcher=None if watch else watcher,
+            **kwargs,
+        )
 
-    with ReuseAddrTCPServer(("", port), handler) as httpd:
+    with PreviewServer(("", port), handler) as httpd:
         url = f"http://localhost:{port}"
         print(f"Serving docs preview at {url}")
+        if watch:
+            print(f"Watching {docs_path} for changes")
         print("Press Ctrl+C to stop")
         timer = threading.Timer(0.5, lambda: webbrowser.open(url))
         timer.start()
@@ -149,4 +341,6 @@ def run(docs_path: Path, port: int = DEFAULT_PREVIEW_PORT) -> int:
             print("\nStopped")
         finally:
             timer.cancel()
+            stop_watch.set()
+            blob_reader.close()
     return 0
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable
+
+from doctrace.commands.preview.graph import GraphView, graph_data_from_tree
+from doctrace.core.config import Config
+from doctrace.core.constants import MARKDOWN_GLOB, WATCH_HISTORY_SIZE, WATCH_INTERVAL
+from doctrace.core.docs import DependencyTree, build_dependency_tree, update_doc_index
+from doctrace.core.graph import DocGraph
+
+
+def snapshot_docs(docs_path: Path) -> dict[Path, tuple[int, int]]:
+    snapshot = {}
+    for md_file in docs_path.rglob(MARKDOWN_GLOB):
+        try:
+            stat = md_file.stat()
+        except OSError:
+            continue
+        snapshot[md_file] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def diff_snapshots(old: dict[Path, tuple[int, int]], new: dict[Path, tuple[int, int]]) -> tuple[list[Path], list[Path]]:
+    changed = [path for path, signature in new.items() if old.get(path) != signature]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+class DocWatcher:
+    def __init__(self, docs_path: Path, interval: float = WATCH_INTERVAL):
+        self.docs_path = docs_path
+        self.interval = interval
+        self.snapshot = snapshot_docs(docs_path)
+        self.listeners: list[Callable[[list[Path], list[Path]], Any]] = []
+        self.lock = threading.Lock()
+        self.polled_at = time.monotonic()
+        self.refresher: threading.Thread | None = None
+
+    def poll(self) -> tuple[list[Path], list[Path]]:
+        snapshot = snapshot_docs(self.docs_path)
+        changed, removed = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if changed or removed:
+            for listener in self.listeners:
+                try:
+                    listener(changed, removed)
+                except Exception as e:
+                    print(
+                        f"Watch update failed in {getattr(listener, '__qualname__', listener)}: {e!r}", file=sys.stderr
+                    )
+        return changed, removed
+
+    def refresh(self) -> None:
+        if time.monotonic() - self.polled_at < self.interval or not self.lock.acquire(blocking=False):
+            return
+        self.polled_at = time.monotonic()
+        self.refresher = threading.Thread(target=self._poll_and_release, daemon=True)
+        self.refresher.start()
+
+    def _poll_and_release(self) -> None:
+        try:
+            self.poll()
+        finally:
+            self.polled_at = time.monotonic()
+            self.lock.release()
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            self.poll()
+
+
+class LiveGraph:
+    def __init__(self, docs_path: Path, config: Config, repo_root: Path, jobs: int | None = None):
+        self.docs_path = docs_path
+        self.config = config
+        self.repo_root = repo_root
+        tree = build_dependency_tree(docs_path, config, repo_root, jobs)
+        self.index = tree.index
+        self.node_ids = {doc: f"N{i}" for i, doc in enumerate(tree.doc_deps)}
+        self._next_id = len(self.node_ids)
+        self.view = GraphView(graph_data_from_tree(tree, repo_root, self.node_ids))
+        self._reset_levels(tree.levels, bool(tree.circular))
+        self.version = 0
+        self.deltas: deque[dict[str, Any]] = deque(maxlen=WATCH_HISTORY_SIZE)
+        self.condition = threading.Condition()
+
+    @property
+    def graph_data(self) -> dict[str, Any]:
+        return self.view.snapshot()
+
+    def apply(self, changed: list[Path], removed: list[Path]) -> dict[str, Any] | None:
+        old_graph = self.index.graph
+        self.index = update_doc_index(self.index, changed, removed, self.config, self.repo_root)
+        touched = _touched_docs(old_graph, self.index.graph, [*changed, *removed])
+        old_nodes = {doc: self.node_ids[doc] for doc in touched if doc in self.node_ids}
+        old_edges = _doc_edges(old_graph, touched, self.node_ids)
+        for doc in (*changed, *removed):
+            if doc not in self.index.parsed_cache:
+                self.node_ids.pop(doc, None)
+            elif doc not in self.node_ids:
+                self.node_ids[doc] = f"N{self._next_id}"
+                self._next_id += 1
+        delta = None if self.cyclic else self._incremental_delta(old_graph, touched, old_nodes, old_edges)
+        if delta is None:
+            delta = self._full_delta()
+        if _unchanged(delta, self.view):
+            return None
+        with self.condition:
+            self.version += 1
+            delta["version"] = self.version
+            self.view.apply(delta, self.version)
+            self.deltas.append(delta)
+            self.condition.notify_all()
+        return delta
+
+    def _reset_levels(self, levels: list[list[Path]], cyclic: bool) -> None:
+        self.doc_levels = {doc: level for level, level_docs in enumerate(levels) for doc in level_docs}
+        self.level_counts = [len(level_docs) for level_docs in levels]
+        self.cyclic = cyclic
+
+    def _full_delta(self) -> dict[str, Any]:
+        level_result = self.index.graph.compute_levels()
+        tree = DependencyTree(
+            levels=level_result.levels,
+            circular=level_result.circular,
+            cycles=level_result.cycles,
+            doc_deps=self.index.forward_deps,
+            index=self.index,
+        )
+        self._reset_levels(level_result.levels, bool(level_result.circular))
+        return _graph_delta(self.view.snapshot(), graph_data_from_tree(tree, self.repo_root, self.node_ids))
+
+    def _incremental_delta(
+        self,
+        old_graph: DocGraph,
+        touched: set[Path],
+        old_nodes: dict[Path, str],
+        old_edges: dict[tuple[str, str, bool], dict[str, Any]],
+    ) -> dict[str, Any] | None:
+        graph = self.index.graph
+        dirty = {graph.ids[doc]: None for doc in touched if doc in graph.ids}
+        for doc in touched:
+            if doc in graph.ids:
+                dirty.update(
+                    (dep, None) for dep in graph.forward(graph.ids[doc]) if graph.docs[dep] not in old_graph.ids
+                )
+        stack = list(dirty)
+        while stack:
+            for dependent in graph.reverse(stack.pop()):
+                if dependent not in dirty:
+                    dirty[dependent] = None
+                    stack.append(dependent)
+        levels = _dirty_levels(graph, dirty, self.doc_levels)
+        if levels is None:
+            return None
+
+        counts = self.level_counts
+        for doc in touched:
+            if doc not in graph.ids and doc in self.doc_levels:
+                counts[self.doc_levels.pop(doc)] -= 1
+            if doc in old_graph.ids:
+                for dep in old_graph.forward(old_graph.ids[doc]):
+                    gone = old_graph.docs[dep]
+                    if gone not in graph.ids and gone in self.doc_levels:
+                        counts[self.doc_levels.pop(gone)] -= 1
+        moved = []
+        for doc_id, level in levels.items():
+            doc = graph.docs[doc_id]
+            previous = self.doc_levels.get(doc)
+            if previous == level:
+                continue
+            if previous is not None:
+                counts[previous] -= 1
+            counts.extend(0 for _ in range(level + 1 - len(counts)))
+            counts[level] += 1
+            self.doc_levels[doc] = level
+            moved.append(doc)
+        while len(counts) > 1 and not counts[-1]:
+            counts.pop()
+
+        new_edges = _doc_edges(graph, touched, self.node_ids)
+        added_docs = [doc for doc in touched if doc in self.node_ids and doc not in old_nodes]
+        updated_docs = [doc for doc in moved if doc in self.node_ids and (doc in old_nodes or doc not in touched)]
+        return {
+            "nodes": {
+                "added": [self._node(doc) for doc in added_docs],
+                "updated": [self._node(doc) for doc in updated_docs],
+                "removed": [node_id for doc, node_id in old_nodes.items() if doc not in self.node_ids],
+            },
+            "edges": {
+                "added": [edge for key, edge in new_edges.items() if key not in old_edges],
+                "removed": [edge for key, edge in old_edges.items() if key not in new_edges],
+            },
+            "levels": [{"level": i, "count": count, "label": f"Level {i}"} for i, count in enumerate(counts)],
+            "stats": {
+                "total": len(self.index.parsed_cache),
+                "level_0": counts[0],
+                "circular": 0,
+                "max_depth": len(counts) - 1,
+            },
+        }
+
+    def _node(self, doc: Path) -> dict[str, Any]:
+        return {
+            "id": self.node_ids[doc],
+            "path": str(doc.relative_to(self.repo_root)),
+            "name": doc.stem,
+            "level": self.doc_levels[doc],
+        }
+
+    def wait_events(self, version: int, timeout: float) -> list[tuple[str, dict[str, Any]]]:
+        with self.condition:
+            self.condition.wait_for(lambda: self.version > version, timeout)
+            if self.version <= version:
+                return []
+            if self.deltas and self.deltas[0]["version"] <= version + 1:
+                return [("delta", delta) for delta in self.deltas if delta["version"] > version]
+            return [("snapshot", self.view.summary())]
+
+
+def _graph_delta(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    old_nodes = {node["id"]: node for node in old["nodes"]}
+    new_nodes = {node["id"]: node for node in new["nodes"]}
+    old_edges = {_edge_key(edge): edge for edge in old["edges"]}
+    new_edges = {_edge_key(edge): edge for edge in new["edges"]}
+    return {
+        "nodes": {
+            "added": [node for node_id, node in new_nodes.items() if node_id not in old_nodes],
+            "updated": [
+                node for node_id, node in new_nodes.items() if node_id in old_nodes and old_nodes[node_id] != node
+            ],
+            "removed": [node_id for node_id in old_nodes if node_id not in new_nodes],
+        },
+        "edges": {
+            "added": [edge for key, edge in new_edges.items() if key not in old_edges],
+            "removed": [edge for key, edge in old_edges.items() if key not in new_edges],
+        },
+        "levels": new["levels"],
+        "stats": new["stats"],
+    }
+
+
+def _unchanged(delta: dict[str, Any], view: GraphView) -> bool:
+    return (
+        not any(delta["nodes"].values())
+        and not any(delta["edges"].values())
+        and delta["levels"] == view.levels_info
+        and delta["stats"] == view.stats
+    )
+
+
+def _touched_docs(old_graph: DocGraph, graph: DocGraph, docs: list[Path]) -> set[Path]:
+    touched = set(docs)
+    for doc in docs:
+        for doc_graph in (old_graph, graph):
+            if doc in doc_graph.ids:
+                touched.update(doc_graph.docs[dependent] for dependent in doc_graph.reverse(doc_graph.ids[doc]))
+    return touched
+
+
+def _doc_edges(
+    graph: DocGraph, docs: set[Path], node_ids: dict[Path, str]
+) -> dict[tuple[str, str, bool], dict[str, Any]]:
+    edges = {}
+    for doc in docs:
+        target = node_ids.get(doc)
+        if target is None or doc not in graph.ids:
+            continue
+        for dep in graph.forward(graph.ids[doc]):
+            source = node_ids.get(graph.docs[dep])
+            if source is not None:
+                edges[source, target, False] = {"from": source, "to": target}
+    return edges
+
+
+def _dirty_levels(graph: DocGraph, dirty: dict[int, None], doc_levels: dict[Path, int]) -> dict[int, int] | None:
+    levels: dict[int, int] = {}
+    on_path: set[int] = set()
+
+    def level_of(dep: int) -> int:
+        return levels[dep] if dep in dirty else doc_levels[graph.docs[dep]]
+
+    for root in dirty:
+        if root in levels:
+            continue
+        on_path.add(root)
+        work = [(root, iter(graph.forward(root)))]
+        while work:
+            doc, deps = work[-1]
+            for dep in deps:
+                if dep in dirty and dep not in levels:
+                    if dep in on_path:
+                        return None
+                    on_path.add(dep)
+                    work.append((dep, iter(graph.forward(dep))))
+                    break
+            else:
+                work.pop()
+                on_path.discard(doc)
+                levels[doc] = max((level_of(dep) + 1 for dep in graph.forward(doc)), default=0)
+    return levels
+
+
+def _edge_key(edge: dict[str, Any]) -> tuple[str, str, bool]:
+    return edge["from"], edge["to"], edge.get("circular", False)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from doctrace.core.constants import CACHE_DIR, DOC_CACHE_FILENAME, DOC_CACHE_VERSION, GIT_DIR
+from doctrace.core.docs import ParsedDoc, RefEntry
+
+if TYPE_CHECKING:
+    from doctrace.core.config import Config, MetadataConfig
+    from doctrace.core.filtering import IgnoreMatcher
+
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+def git_blob_hash(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def resolve_cache_path(repo_root: Path, config: Config) -> Path | None:
+    if config.cache_dir is not None:
+        return repo_root / config.cache_dir / DOC_CACHE_FILENAME
+    git_dir = repo_root / GIT_DIR
+    if git_dir.is_dir():
+        return git_dir / CACHE_DIR / DOC_CACHE_FILENAME
+    return None
+
+
+def load_doc_cache(repo_root: Path, config: Config) -> DocCache | None:
+    cache_path = resolve_cache_path(repo_root, config)
+    if cache_path is None:
+        return None
+    return DocCache.load(cache_path, repo_root, config.metadata)
+
+
+class DocCache:
+    def __init__(
+        self,
+        cache_path: Path,
+        repo_root: Path,
+        metadata_config: MetadataConfig,
+        entries: dict[str, dict[str, Any]],
+    ):
+        self.cache_path = cache_path
+        self.repo_root = repo_root
+        self.metadata_config = metadata_config
+        self.entries = entries
+        self.pending: dict[str, tuple[int | None, int | None, str]] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, cache_path: Path, repo_root: Path, metadata_config: MetadataConfig) -> DocCache:
+        entries: dict[str, dict[str, Any]] = {}
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == DOC_CACHE_VERSION and data.get("metadata") == _metadata_keys(metadata_config):
+                entries = data.get("docs", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return cls(cache_path, repo_root, metadata_config, entries)
+
+    def lookup(self, filepath: Path, blob_hash: str | None = None, inline_refs: bool = False) -> ParsedDoc | None:
+        key = self.key(filepath)
+        entry = self.entries.get(key)
+        if entry and inline_refs and entry["doc"][5] is None:
+            entry = None
+        if blob_hash is not None:
+            if entry and entry["hash"] == blob_hash:
+                return _decode(entry["doc"])
+            self.pending[key] = (None, None, blob_hash)
+            return None
+        stat = filepath.stat()
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return _decode(entry["doc"])
+        blob_hash = git_blob_hash(filepath.read_bytes())
+        if entry and entry["hash"] == blob_hash:
+            entry["mtime_ns"] = _trusted_mtime(stat)
+            entry["size"] = stat.st_size
+            self.dirty = True
+            return _decode(entry["doc"])
+        self.pending[key] = (_trusted_mtime(stat), stat.st_size, blob_hash)
+        return None
+
+    def store(self, filepath: Path, parsed: ParsedDoc) -> None:
+        key = self.key(filepath)
+        mtime_ns, size, blob_hash = self.pending.pop(key)
+        self.entries[key] = {"mtime_ns": mtime_ns, "size": size, "hash": blob_hash, "doc": _encode(parsed)}
+        self.dirty = True
+
+    def prune(self, docs_path: Path, seen_docs: Iterable[Path], ignore: IgnoreMatcher | None = None) -> None:
+        docs_key = self.key(docs_path)
+        prefix = "" if docs_key == "." else docs_key + "/"
+        seen = {self.key(doc) for doc in seen_docs}
+        stale = [
+            key
+            for key in self.entries
+            if key.startswith(prefix) and key not in seen and not (ignore and ignore.matches(key))
+        ]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        data = {
+            "version": DOC_CACHE_VERSION,
+            "metadata": _metadata_keys(self.metadata_config),
+            "docs": self.entries,
+        }
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.cache_path)
+            self.dirty = False
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+
+    def key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.repo_root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+
+def _metadata_keys(metadata_config: MetadataConfig) -> list[str]:
+    return [metadata_config.required_docs_key, metadata_config.related_docs_key, metadata_config.sources_key]
+
+
+def _trusted_mtime(stat: os.stat_result) -> int | None:
+    if time.time_ns() - stat.st_mtime_ns < RACY_MTIME_WINDOW_NS:
+        return None
+    return stat.st_mtime_ns
+
+
+def _encode(parsed: ParsedDoc) -> list[Any]:
+    return [
+        [list(ref) for ref in parsed.required_docs],
+        [list(ref) for ref in parsed.related_docs],
+        [list(ref) for ref in parsed.sources],
+        parsed.title,
+        parsed.description,
+        None if parsed.inline_refs is None else [list(ref) for ref in parsed.inline_refs],
+    ]
+
+
+def _decode(data: list[Any]) -> ParsedDoc:
+    required_docs, related_docs, sources, title, description, inline_refs = data
+    return ParsedDoc(
+        required_docs=[RefEntry(*ref) for ref in required_docs],
+        related_docs=[RefEntry(*ref) for ref in related_docs],
+        sources=[RefEntry(*ref) for ref in sources],
+        title=title,
+        description=description,
+        inline_refs=None if inline_refs is None else [RefEntry(*ref) for ref in inline_refs],
+    )
@@ -22,6 +22,7 @@ class Config:
     def __init__(self, data: dict[str, Any]):
         self.metadata: MetadataConfig = MetadataConfig(data.get("metadata", {}))
         self.ignore_inline_refs: list[str] = data.get("ignore_inline_refs", [])
+        self.cache_dir: str | None = data.get("cache_dir")
 
     def to_dict(self) -> dict[str, Any]:
         result: dict[str, Any] = {}
@@ -33,6 +34,8 @@ class Config:
             }
         if self.ignore_inline_refs:
             result["ignore_inline_refs"] = self.ignore_inline_refs
+        if self.cache_dir is not None:
+            result["cache_dir"] = self.cache_dir
         return result
 
     def _has_custom_metadata(self) -> bool:
@@ -45,7 +48,7 @@ class Config:
 
 def validate_config(data: dict[str, Any]) -> list[str]:
     errors = []
-    valid_keys = {"metadata", "ignore_inline_refs"}
+    valid_keys = {"metadata", "ignore_inline_refs", "cache_dir"}
     for key in data:
         if key not in valid_keys:
             errors.append(f"unknown key: {key}")
@@ -57,6 +60,8 @@ def validate_config(data: dict[str, Any]) -> list[str]:
             errors.append("ignore_inline_refs must be an array")
         elif not all(isinstance(item, str) for item in val):
             errors.append("ignore_inline_refs items must be strings")
+    if "cache_dir" in data and not isinstance(data["cache_dir"], str):
+        errors.append("cache_dir must be a string")
     return errors
 
 
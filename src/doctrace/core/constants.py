@@ -2,9 +2,32 @@ APP_NAME = "doctrace"
 CLI_ALIASES = [APP_NAME]
 CONFIG_FILENAME = "doctrace.json"
 GIT_DIR = ".git"
+CACHE_DIR = "doctrace"
+DOC_CACHE_FILENAME = "doc-index.json"
+DOC_CACHE_VERSION = 3
 
 DEFAULT_PREVIEW_PORT = 8420
+WATCH_INTERVAL = 1.0
+WATCH_HISTORY_SIZE = 64
+SSE_HEARTBEAT_INTERVAL = 15.0
+PREVIEW_MAX_WORKERS = 32
+PREVIEW_MAX_STREAMS = 16
+PREVIEW_KEEPALIVE_TIMEOUT = 15.0
+PREVIEW_BUSY_TIMEOUT = 1.0
+GZIP_MIN_SIZE = 1024
+GZIP_CACHE_SIZE = 32
+SEARCH_MAX_MATCHES = 3
+SEARCH_SNIPPET_LENGTH = 100
+SEARCH_MIN_TOKEN = 3
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 500
+GRAPH_PAGE_SIZE = 1000
+GRAPH_MAX_DEPTH = 5
 MARKDOWN_GLOB = "*.md"
+PARALLEL_PARSE_THRESHOLD = 512
+PARSE_CHUNK_SIZE = 64
+EXISTS_CACHE_SIZE = 65536
+BLOB_CACHE_SIZE = 256
 
 DEFAULT_METADATA = {
     "required_docs_key": "required_docs",
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
+import fnmatch
+import os
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from itertools import chain, repeat
 from pathlib import Path
-from typing import TYPE_CHECKING, NamedTuple
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Mapping, NamedTuple
 
-from doctrace.core.constants import MARKDOWN_GLOB
+from doctrace.core.constants import MARKDOWN_GLOB, PARALLEL_PARSE_THRESHOLD, PARSE_CHUNK_SIZE
+from doctrace.core.filtering import IgnoreMatcher, compile_ignore_patterns
+from doctrace.core.graph import DocGraph, ForwardDeps, LevelResult, ReverseDeps
+from doctrace.core.sources import RepoFiles, SourceIndex
 
 if TYPE_CHECKING:
+    from doctrace.core.cache import DocCache
     from doctrace.core.config import Config, MetadataConfig
 
 LIST_ITEM_YAML = re.compile(r"^\s*-\s+([^:]+?):\s*(.*)$")
+INDENT_CHARS = " \t-"
+INLINE_REF_CHARS = "a-zA-Z0-9/_.-"
+INLINE_REF = re.compile(rf"[{INLINE_REF_CHARS}]+\.md")
+BACKTICK_RUN = re.compile(r"`+")
+FENCE_CHARS = ("`", "~")
+FENCE_MIN_LENGTH = 3
 
 
 class RefEntry(NamedTuple):
@@ -25,107 +41,227 @@ class ParsedDoc(NamedTuple):
     sources: list[RefEntry]
     title: str
     description: str
+    inline_refs: list[RefEntry] | None = None
 
 
 SCALAR_FIELD = re.compile(r"^(\w+):\s*(.+)$")
 
 
-def parse_doc(filepath: Path, metadata_config: MetadataConfig | None = None) -> ParsedDoc:
+def parse_doc(filepath: Path, metadata_config: MetadataConfig | None = None, inline_refs: bool = False) -> ParsedDoc:
     from doctrace.core.config import MetadataConfig
 
     if metadata_config is None:
         metadata_config = MetadataConfig({})
 
-    content = filepath.read_text(encoding="utf-8")
-    lines = content.splitlines()
-    metadata_lines = _get_frontmatter_section(lines)
+    with open(filepath, "rb") as f:
+        metadata_lines, body_lines = _split_frontmatter(_iter_lines(f))
+        body_refs = scan_inline_refs(body_lines) if inline_refs else None
 
-    required_docs_pattern = re.compile(rf"^{re.escape(metadata_config.required_docs_key)}:\s*$", re.IGNORECASE)
-    related_docs_pattern = re.compile(rf"^{re.escape(metadata_config.related_docs_key)}:\s*$", re.IGNORECASE)
-    sources_pattern = re.compile(rf"^{re.escape(metadata_config.sources_key)}:\s*$", re.IGNORECASE)
+    return _parse_frontmatter(metadata_lines, metadata_config, body_refs)
 
-    required_docs = _extract_section(metadata_lines, required_docs_pattern)
-    related_docs = _extract_section(metadata_lines, related_docs_pattern)
-    sources = _extract_section(metadata_lines, sources_pattern)
-    title, description = _extract_scalars(metadata_lines)
-    return ParsedDoc(
-        required_docs=required_docs,
-        related_docs=related_docs,
-        sources=sources,
-        title=title,
-        description=description,
-    )
+
+def _iter_lines(f: BinaryIO) -> Iterator[str]:
+    for raw_line in f:
+        yield from raw_line.decode("utf-8").splitlines()
 
 
-def _get_frontmatter_section(lines: list[str]) -> list[tuple[int, str]]:
-    if not lines or lines[0].strip() != "---":
-        return []
-    end_line = None
-    for i, line in enumerate(lines[1:], start=1):
+def _split_frontmatter(lines: Iterable[str]) -> tuple[list[tuple[int, str]], Iterable[tuple[int, str]]]:
+    numbered = enumerate(lines, start=1)
+    first = next(numbered, None)
+    if first is None:
+        return [], ()
+    if first[1].strip() != "---":
+        return [], chain([first], numbered)
+    section: list[tuple[int, str]] = []
+    for line_num, line in numbered:
         if line.strip() == "---":
-            end_line = i
-            break
-    if end_line is None:
-        return []
-    return [(i + 1, line) for i, line in enumerate(lines) if 0 < i < end_line]
+            return section, numbered
+        section.append((line_num, line))
+    return [], section
 
 
-def _extract_section(lines: list[tuple[int, str]], header_pattern: re.Pattern) -> list[RefEntry]:
-    entries = []
-    in_section = False
-    for line_num, line in lines:
-        if header_pattern.match(line):
-            in_section = True
-            continue
-        if in_section:
-            if not line.strip():
+def read_inline_refs(filepath: Path, pattern: re.Pattern[str] = INLINE_REF) -> list[RefEntry]:
+    with open(filepath, "rb") as f:
+        return scan_inline_refs(_split_frontmatter(_iter_lines(f))[1], pattern)
+
+
+def scan_inline_refs(body_lines: Iterable[tuple[int, str]], pattern: re.Pattern[str] = INLINE_REF) -> list[RefEntry]:
+    refs: dict[str, RefEntry] = {}
+    fence = ""
+    try:
+        for line_num, line in body_lines:
+            stripped = line.lstrip()
+            if fence:
+                if stripped.startswith(fence) and not stripped.rstrip().lstrip(fence[0]):
+                    fence = ""
                 continue
-            if line.strip().startswith("-"):
-                match = LIST_ITEM_YAML.match(line)
-                if match:
-                    path = match.group(1).strip()
-                    desc = match.group(2).strip() if match.group(2) else ""
-                    entries.append(RefEntry(path=path, description=desc, line_number=line_num))
-            else:
-                break
-    return entries
+            if stripped[:1] in FENCE_CHARS:
+                marker = stripped[0]
+                run = len(stripped) - len(stripped.lstrip(marker))
+                if run >= FENCE_MIN_LENGTH and not (marker == "`" and "`" in stripped[run:]):
+                    fence = marker * run
+                    continue
+            _scan_line(line, line_num, pattern, refs)
+    except UnicodeDecodeError:
+        pass
+    return list(refs.values())
+
+
+def _scan_line(line: str, line_num: int, pattern: re.Pattern[str], refs: dict[str, RefEntry]) -> None:
+    pos = 0
+    if "`" in line:
+        runs = [(match.start(), match.end()) for match in BACKTICK_RUN.finditer(line)]
+        closers: list[int | None] = [None] * len(runs)
+        last_by_length: dict[int, int] = {}
+        for i in range(len(runs) - 1, -1, -1):
+            length = runs[i][1] - runs[i][0]
+            closers[i] = last_by_length.get(length)
+            last_by_length[length] = i
+        i = 0
+        while i < len(runs):
+            closer = closers[i]
+            if closer is None:
+                i += 1
+                continue
+            _collect_refs(line, pos, runs[i][0], line_num, pattern, refs)
+            pos = runs[closer][1]
+            i = closer + 1
+    _collect_refs(line, pos, len(line), line_num, pattern, refs)
+
+
+def _collect_refs(
+    line: str, start: int, end: int, line_num: int, pattern: re.Pattern[str], refs: dict[str, RefEntry]
+) -> None:
+    for match in pattern.finditer(line, start, end):
+        ref = match.group()
+        if ref not in refs:
+            refs[ref] = RefEntry(ref, "", line_num)
+
+
+class SectionHeaders(NamedTuple):
+    pattern: re.Pattern[str]
+    targets: tuple[tuple[int, ...], ...]
+    skip_indented: bool
+
+
+@lru_cache(maxsize=None)
+def _compile_section_headers(keys: tuple[str, ...]) -> SectionHeaders:
+    headers = [re.compile(rf"^{re.escape(key)}:\s*$", re.IGNORECASE) for key in keys]
+    return SectionHeaders(
+        pattern=re.compile(rf"^(?:{'|'.join(f'({re.escape(key)})' for key in keys)}):\s*$", re.IGNORECASE),
+        targets=tuple(tuple(i for i, header in enumerate(headers) if header.match(f"{key}:")) for key in keys),
+        skip_indented=not any(key[:1] in INDENT_CHARS for key in keys),
+    )
 
 
-def _extract_scalars(lines: list[tuple[int, str]]) -> tuple[str, str]:
+def _parse_frontmatter(
+    lines: list[tuple[int, str]], metadata_config: MetadataConfig, inline_refs: list[RefEntry] | None = None
+) -> ParsedDoc:
+    header_pattern, header_targets, skip_indented = _compile_section_headers(
+        (metadata_config.required_docs_key, metadata_config.related_docs_key, metadata_config.sources_key)
+    )
+    sections: tuple[list[RefEntry], ...] = ([], [], [])
+    active: list[int] = []
+    closed: set[int] = set()
     title = ""
     description = ""
-    for _, line in lines:
-        match = SCALAR_FIELD.match(line)
-        if match:
-            key = match.group(1).lower()
-            value = match.group(2).strip()
-            if key == "title":
-                title = value
-            elif key == "description":
-                description = value
-            if title and description:
-                break
-    return title, description
+    for line_num, line in lines:
+        if not (skip_indented and line[:1] in INDENT_CHARS):
+            if not (title and description):
+                scalar = SCALAR_FIELD.match(line)
+                if scalar:
+                    key = scalar.group(1).lower()
+                    if key == "title":
+                        title = scalar.group(2).strip()
+                    elif key == "description":
+                        description = scalar.group(2).strip()
+            header = header_pattern.match(line)
+            if header:
+                matched = header_targets[header.lastindex - 1]
+                closed.update(i for i in active if i not in matched)
+                active = [i for i in matched if i not in closed]
+                continue
+        if not active:
+            continue
+        item = LIST_ITEM_YAML.match(line)
+        if item:
+            ref = RefEntry(item.group(1).strip(), item.group(2).strip(), line_num)
+            for i in active:
+                sections[i].append(ref)
+            continue
+        stripped = line.strip()
+        if stripped and not stripped.startswith("-"):
+            closed.update(active)
+            active = []
+    required_docs, related_docs, sources = sections
+    return ParsedDoc(
+        required_docs=required_docs,
+        related_docs=related_docs,
+        sources=sources,
+        title=title,
+        description=description,
+        inline_refs=inline_refs,
+    )
 
 
 class DocIndex(NamedTuple):
     parsed_cache: dict[Path, ParsedDoc]
     source_to_docs: dict[str, list[Path]]
-    forward_deps: dict[Path, list[Path]]
-    reverse_deps: dict[Path, list[Path]]
-
-
-def build_doc_index(docs_path: Path, config: Config, repo_root: Path) -> DocIndex:
+    forward_deps: Mapping[Path, list[Path]]
+    reverse_deps: Mapping[Path, list[Path]]
+    source_index: SourceIndex
+    repo_files: RepoFiles
+    graph: DocGraph
+
+
+def build_doc_index(
+    docs_path: Path,
+    config: Config,
+    repo_root: Path,
+    use_cache: bool = True,
+    jobs: int | None = None,
+    repo_files: RepoFiles | None = None,
+    ignore_patterns: list[str] | None = None,
+    inline_refs: bool = False,
+) -> DocIndex:
+    from doctrace.core.cache import load_doc_cache
+
+    if repo_files is None:
+        repo_files = RepoFiles(repo_root)
+    cache = load_doc_cache(repo_root, config) if use_cache else None
     parsed_cache: dict[Path, ParsedDoc] = {}
     source_to_docs: dict[str, list[Path]] = defaultdict(list)
-    forward_deps: dict[Path, list[Path]] = defaultdict(list)
-    reverse_deps: dict[Path, list[Path]] = defaultdict(list)
-
-    doc_files = [f.resolve() for f in docs_path.rglob(MARKDOWN_GLOB)]
-    for doc_file in doc_files:
-        try:
-            parsed = parse_doc(doc_file, config.metadata)
-        except (OSError, UnicodeDecodeError, ValueError):
+    graph_ids: dict[Path, int] = {}
+    graph_docs: list[Path] = []
+    adjacency: list[list[int]] = []
+    ref_ids: dict[str, int | None] = {}
+
+    ignore = compile_ignore_patterns(tuple(ignore_patterns or ()))
+    doc_files, pruned_dirs = _discover_docs(docs_path, repo_root, cache is not None, ignore)
+    ignored = dict(entry for entry in doc_files if ignore and ignore.matches_path(entry[0], repo_root))
+    kept = [entry for entry in doc_files if entry[0] not in ignored]
+    loaded = _load_docs(kept, cache, config.metadata, jobs, inline_refs)
+    frontier = list(loaded.values())
+    while frontier and (ignored or pruned_dirs):
+        needed: dict[Path, str | None] = {}
+        for parsed in frontier:
+            if parsed is None:
+                continue
+            for ref in parsed.required_docs:
+                doc_file = repo_root / ref.path
+                if doc_file in ignored:
+                    needed[doc_file] = ignored.pop(doc_file)
+                elif doc_file not in loaded and _in_pruned_dir(doc_file, pruned_dirs):
+                    needed[doc_file] = None
+        required = _load_docs(list(needed.items()), cache, config.metadata, jobs, inline_refs)
+        loaded.update(required)
+        frontier = list(required.values())
+    if ignore:
+        discovered = {doc_file: loaded[doc_file] for doc_file, _ in doc_files if doc_file in loaded}
+        loaded = {**discovered, **loaded}
+
+    for doc_file, parsed in loaded.items():
+        if parsed is None:
             continue
 
         parsed_cache[doc_file] = parsed
@@ -133,84 +269,247 @@ def build_doc_index(docs_path: Path, config: Config, repo_root: Path) -> DocInde
         for ref in parsed.sources:
             source_to_docs[ref.path].append(doc_file)
 
+        deps = adjacency[_intern_doc(doc_file, graph_ids, graph_docs, adjacency)]
         for ref in parsed.required_docs:
-            ref_path = repo_root / ref.path
-            if ref_path.exists():
-                forward_deps[doc_file].append(ref_path)
-                reverse_deps[ref_path].append(doc_file)
+            if ref.path in ref_ids:
+                ref_id = ref_ids[ref.path]
+            elif repo_files.exists(ref.path):
+                ref_id = ref_ids[ref.path] = _intern_doc(repo_root / ref.path, graph_ids, graph_docs, adjacency)
+            else:
+                ref_id = ref_ids[ref.path] = None
+            if ref_id is not None:
+                deps.append(ref_id)
 
-        forward_deps.setdefault(doc_file, [])
+    if cache is not None:
+        cache.prune(docs_path, parsed_cache.keys(), ignore)
+        cache.save()
 
+    source_to_docs = dict(source_to_docs)
+    graph = DocGraph.from_adjacency(graph_docs, adjacency)
     return DocIndex(
-        parsed_cache=dict(parsed_cache),
-        source_to_docs=dict(source_to_docs),
-        forward_deps=dict(forward_deps),
-        reverse_deps=dict(reverse_deps),
+        parsed_cache=parsed_cache,
+        source_to_docs=source_to_docs,
+        forward_deps=ForwardDeps(graph, parsed_cache),
+        reverse_deps=ReverseDeps(graph),
+        source_index=SourceIndex(source_to_docs),
+        repo_files=repo_files,
+        graph=graph,
     )
 
 
-class LevelResult(NamedTuple):
-    levels: list[list[Path]]
-    circular: list[tuple[Path, Path]]
+def _load_docs(
+    doc_files: list[tuple[Path, str | None]],
+    cache: DocCache | None,
+    metadata_config: MetadataConfig,
+    jobs: int | None,
+    inline_refs: bool,
+) -> dict[Path, ParsedDoc | None]:
+    loaded: dict[Path, ParsedDoc | None] = {}
+    pending: list[Path] = []
+    for doc_file, blob_hash in doc_files:
+        try:
+            parsed = cache.lookup(doc_file, blob_hash, inline_refs) if cache is not None else None
+        except OSError:
+            continue
+        loaded[doc_file] = parsed
+        if parsed is None:
+            pending.append(doc_file)
+
+    for doc_file, parsed in zip(pending, parse_docs(pending, metadata_config, jobs, inline_refs)):
+        loaded[doc_file] = parsed
+        if parsed is not None and cache is not None:
+            cache.store(doc_file, parsed)
+    return loaded
+
+
+def _in_pruned_dir(doc_file: Path, pruned_dirs: list[Path]) -> bool:
+    if not pruned_dirs or not fnmatch.fnmatchcase(doc_file.name, MARKDOWN_GLOB):
+        return False
+    if not any(pruned_dir in doc_file.parents for pruned_dir in pruned_dirs):
+        return False
+    return doc_file.is_file() and doc_file.resolve() == doc_file
+
+
+def _intern_doc(doc: Path, graph_ids: dict[Path, int], graph_docs: list[Path], adjacency: list[list[int]]) -> int:
+    doc_id = graph_ids.get(doc)
+    if doc_id is None:
+        doc_id = graph_ids[doc] = len(graph_docs)
+        graph_docs.append(doc)
+        adjacency.append([])
+    return doc_id
+
+
+def update_doc_index(
+    index: DocIndex,
+    changed: Iterable[Path],
+    removed: Iterable[Path],
+    config: Config,
+    repo_root: Path,
+) -> DocIndex:
+    changed = list(changed)
+    removed = list(removed)
+    parsed_cache = index.parsed_cache
+    moved_refs = {doc.relative_to(repo_root).as_posix() for doc in removed}
+    moved_refs.update(doc.relative_to(repo_root).as_posix() for doc in changed if doc not in parsed_cache)
+
+    for doc in (*removed, *changed):
+        parsed = parsed_cache.pop(doc, None)
+        if parsed is None:
+            continue
+        for ref in parsed.sources:
+            docs = index.source_to_docs[ref.path]
+            docs.remove(doc)
+            if not docs:
+                del index.source_to_docs[ref.path]
+
+    relinked: dict[Path, list[Path]] = {}
+    for doc, parsed in zip(changed, parse_docs(changed, config.metadata)):
+        if parsed is None:
+            continue
+        parsed_cache[doc] = parsed
+        for ref in parsed.sources:
+            index.source_to_docs.setdefault(ref.path, []).append(doc)
+        relinked[doc] = _resolve_deps(parsed, repo_root)
+
+    if moved_refs:
+        for doc, parsed in parsed_cache.items():
+            if doc not in relinked and any(ref.path in moved_refs for ref in parsed.required_docs):
+                relinked[doc] = _resolve_deps(parsed, repo_root)
+
+    forward_deps = index.forward_deps
+    graph = DocGraph.from_deps({doc: relinked[doc] if doc in relinked else forward_deps[doc] for doc in parsed_cache})
+    return index._replace(
+        source_index=SourceIndex(index.source_to_docs),
+        forward_deps=ForwardDeps(graph, parsed_cache),
+        reverse_deps=ReverseDeps(graph),
+        graph=graph,
+    )
 
 
-def compute_levels(doc_deps: dict[Path, list[Path]]) -> LevelResult:
-    all_docs = set(doc_deps.keys())
-    assigned: dict[Path, int] = {}
-    circular: list[tuple[Path, Path]] = []
-
-    def get_level(doc: Path, visiting: set[Path]) -> int:
-        if doc in assigned:
-            return assigned[doc]
-        if doc in visiting:
-            return -1
-        if doc not in doc_deps:
-            assigned[doc] = 0
-            return 0
-        deps = doc_deps[doc]
-        if not deps:
-            assigned[doc] = 0
-            return 0
-        visiting.add(doc)
-        max_dep_level = -1
-        for dep in deps:
-            dep_level = get_level(dep, visiting)
-            if dep_level == -1:
-                circular.append((doc, dep))
-                continue
-            max_dep_level = max(max_dep_level, dep_level)
-        visiting.remove(doc)
-        level = max_dep_level + 1 if max_dep_level >= 0 else 0
-        assigned[doc] = level
-        return level
+def _resolve_deps(parsed: ParsedDoc, repo_root: Path) -> list[Path]:
+    return [repo_root / ref.path for ref in parsed.required_docs if (repo_root / ref.path).exists()]
+
+
+def parse_docs(
+    doc_files: list[Path], metadata_config: MetadataConfig, jobs: int | None = None, inline_refs: bool = False
+) -> list[ParsedDoc | None]:
+    workers = _resolve_parse_workers(jobs, len(doc_files))
+    if workers > 1:
+        chunks = [doc_files[i : i + PARSE_CHUNK_SIZE] for i in range(0, len(doc_files), PARSE_CHUNK_SIZE)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_parse_chunk, chunks, repeat(metadata_config), repeat(inline_refs)))
+            return [parsed for chunk in results for parsed in chunk]
+        except (OSError, BrokenProcessPool):
+            pass
+    return _parse_chunk(doc_files, metadata_config, inline_refs)
 
-    for doc in all_docs:
-        get_level(doc, set())
 
-    max_level = max(assigned.values()) if assigned else 0
-    levels: list[list[Path]] = [[] for _ in range(max_level + 1)]
-    for doc, level in assigned.items():
-        levels[level].append(doc)
+def _resolve_parse_workers(jobs: int | None, doc_count: int) -> int:
+    chunk_count = -(-doc_count // PARSE_CHUNK_SIZE)
+    if jobs is None:
+        if doc_count < PARALLEL_PARSE_THRESHOLD:
+            return 1
+        jobs = os.cpu_count() or 1
+    return max(1, min(jobs, chunk_count))
+
+
+def _parse_chunk(doc_files: list[Path], metadata_config: MetadataConfig, inline_refs: bool) -> list[ParsedDoc | None]:
+    results: list[ParsedDoc | None] = []
+    for doc_file in doc_files:
+        try:
+            results.append(parse_doc(doc_file, metadata_config, inline_refs))
+        except (OSError, UnicodeDecodeError, ValueError):
+            results.append(None)
+    return results
+
+
+def _discover_docs(
+    docs_path: Path, repo_root: Path, use_git: bool, ignore: IgnoreMatcher
+) -> tuple[list[tuple[Path, str | None]], list[Path]]:
+    if use_git:
+        doc_files = _discover_git_docs(docs_path, repo_root)
+        if doc_files is not None:
+            return doc_files, []
+    if not ignore.dir_prefixes:
+        return [(f.resolve(), None) for f in docs_path.rglob(MARKDOWN_GLOB)], []
+    return _walk_docs(docs_path.resolve(), repo_root, ignore)
+
+
+def _walk_docs(
+    docs_path: Path, repo_root: Path, ignore: IgnoreMatcher
+) -> tuple[list[tuple[Path, str | None]], list[Path]]:
+    doc_files: list[tuple[Path, str | None]] = []
+    pruned_dirs: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(docs_path):
+        kept_dirnames = []
+        for dirname in dirnames:
+            subdir = os.path.join(dirpath, dirname)
+            if ignore.covers_dir(os.path.relpath(subdir, repo_root)):
+                pruned_dirs.append(Path(subdir))
+            else:
+                kept_dirnames.append(dirname)
+        dirnames[:] = kept_dirnames
+        for filename in filenames:
+            if fnmatch.fnmatchcase(filename, MARKDOWN_GLOB):
+                doc_files.append((Path(dirpath, filename).resolve(), None))
+    return doc_files, pruned_dirs
+
+
+def _discover_git_docs(docs_path: Path, repo_root: Path) -> list[tuple[Path, str | None]] | None:
+    from doctrace.core.git import get_worktree_blobs
+
+    root = repo_root.resolve()
+    try:
+        docs_rel = docs_path.resolve().relative_to(root).as_posix()
+    except ValueError:
+        return None
+    pathspec = "." if docs_rel == "." else f":(literal){docs_rel}"
+    blobs = get_worktree_blobs(root, pathspec)
+    if blobs is None:
+        return None
+    doc_files = []
+    for rel_path, blob_hash in sorted(blobs.items()):
+        if rel_path.endswith("/"):
+            doc_files.extend((doc_file.resolve(), None) for doc_file in (root / rel_path).rglob(MARKDOWN_GLOB))
+            continue
+        if not fnmatch.fnmatchcase(rel_path, MARKDOWN_GLOB):
+            continue
+        if blob_hash is None:
+            doc_files.append(((root / rel_path).resolve(), None))
+        else:
+            doc_files.append((root / rel_path, blob_hash))
+    return doc_files
 
-    for level_docs in levels:
-        level_docs.sort()
 
-    return LevelResult(levels=levels, circular=circular)
+def compute_levels(doc_deps: dict[Path, list[Path]]) -> LevelResult:
+    return DocGraph.from_deps(doc_deps).compute_levels()
 
 
 class DependencyTree(NamedTuple):
     levels: list[list[Path]]
     circular: list[tuple[Path, Path]]
-    doc_deps: dict[Path, list[Path]]
+    cycles: list[list[Path]]
+    doc_deps: Mapping[Path, list[Path]]
     index: DocIndex
 
 
-def build_dependency_tree(docs_path: Path, config: Config, repo_root: Path) -> DependencyTree:
-    index = build_doc_index(docs_path, config, repo_root)
-    level_result = compute_levels(index.forward_deps)
+def build_dependency_tree(
+    docs_path: Path,
+    config: Config,
+    repo_root: Path,
+    jobs: int | None = None,
+    ignore_patterns: list[str] | None = None,
+    inline_refs: bool = False,
+) -> DependencyTree:
+    index = build_doc_index(
+        docs_path, config, repo_root, jobs=jobs, ignore_patterns=ignore_patterns, inline_refs=inline_refs
+    )
+    level_result = index.graph.compute_levels()
     return DependencyTree(
         levels=level_result.levels,
         circular=level_result.circular,
+        cycles=level_result.cycles,
         doc_deps=index.forward_deps,
         index=index,
     )
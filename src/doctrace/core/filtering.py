@@ -1,11 +1,52 @@
 from __future__ import annotations
 
 import fnmatch
+import os
+import re
+from functools import lru_cache
 from pathlib import Path
 
+GLOB_MAGIC = re.compile(r"[*?[]")
+
+
+class IgnoreMatcher:
+    def __init__(self, patterns: list[str] | tuple[str, ...]):
+        self.patterns = tuple(patterns)
+        self._regex = (
+            re.compile("|".join(fnmatch.translate(os.path.normcase(pat)) for pat in self.patterns))
+            if self.patterns
+            else None
+        )
+        self.dir_prefixes = tuple(
+            os.path.normcase(pat[:-1]) for pat in self.patterns if pat.endswith("*") and not GLOB_MAGIC.search(pat[:-1])
+        )
+        self._results: dict[str, bool] = {}
+
+    def __bool__(self) -> bool:
+        return self._regex is not None
+
+    def matches(self, rel_path: str) -> bool:
+        result = self._results.get(rel_path)
+        if result is None:
+            result = self._regex is not None and self._regex.match(os.path.normcase(rel_path)) is not None
+            self._results[rel_path] = result
+        return result
+
+    def covers_dir(self, rel_dir: str) -> bool:
+        return os.path.normcase(os.path.join(rel_dir, "")).startswith(self.dir_prefixes)
+
+    def matches_path(self, path: Path, repo_root: Path) -> bool:
+        if self._regex is None:
+            return False
+        return self.matches(str(path.relative_to(repo_root)))
+
+
+@lru_cache(maxsize=None)
+def compile_ignore_patterns(patterns: tuple[str, ...]) -> IgnoreMatcher:
+    return IgnoreMatcher(patterns)
+
 
 def matches_ignore_pattern(path: Path, repo_root: Path, patterns: list[str]) -> bool:
     if not patterns:
         return False
-    rel_path = str(path.relative_to(repo_root))
-    return any(fnmatch.fnmatch(rel_path, pat) for pat in patterns)
+    return compile_ignore_patterns(tuple(patterns)).matches_path(path, repo_root)
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+import fnmatch
 import subprocess
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import NamedTuple
 
+from doctrace.core.constants import BLOB_CACHE_SIZE, MARKDOWN_GLOB
+
+SYMLINK_MODE = "120000"
+GITLINK_MODE = "160000"
+DELETED_TAG = "R"
+RENAME_STATUSES = ("R", "C")
+HEX_DIGITS = frozenset("0123456789abcdef")
+SHORT_OBJECT_ID_LENGTH = 7
+
 
 class FileChange(NamedTuple):
     path: str
@@ -66,73 +78,112 @@ def get_merge_base(branch: str, repo_root: Path) -> str | None:
 
 
 def get_changed_files(commit_ref: str, repo_root: Path) -> list[str]:
+    return [change.path for change in get_changed_files_detailed(commit_ref, repo_root)]
+
+
+def get_changed_files_detailed(commit_ref: str, repo_root: Path) -> list[FileChange]:
     try:
         result = subprocess.run(
-            ["git", "diff", "--name-only", commit_ref],
+            ["git", "diff", "-z", "--raw", "--numstat", commit_ref],
             capture_output=True,
             text=True,
             check=True,
             cwd=repo_root,
         )
-        return [f.strip() for f in result.stdout.splitlines() if f.strip()]
     except (subprocess.CalledProcessError, FileNotFoundError):
         return []
+    return _parse_raw_numstat(result.stdout)
 
 
-def get_changed_files_detailed(commit_ref: str, repo_root: Path) -> list[FileChange]:
+def _parse_raw_numstat(output: str) -> list[FileChange]:
     status_map: dict[str, tuple[str, str | None]] = {}
+    stats_map: dict[str, tuple[int | None, int | None]] = {}
+    tokens = output.split("\0")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if not token:
+            continue
+        if token.startswith(":"):
+            status = token.split(" ")[4][0]
+            if status in RENAME_STATUSES:
+                status_map[tokens[i + 1]] = (status, tokens[i])
+                i += 2
+            else:
+                status_map[tokens[i]] = (status, None)
+                i += 1
+        else:
+            added, removed, path = token.split("\t", 2)
+            if not path:
+                path = tokens[i + 1]
+                i += 2
+            stats_map[path] = (_parse_count(added), _parse_count(removed))
+
+    changes = []
+    for path, (status, old_path) in status_map.items():
+        added, removed = stats_map.get(path, (None, None))
+        changes.append(FileChange(path, status, added, removed, old_path))
+    return changes
+
+
+def _parse_count(value: str) -> int | None:
+    return int(value) if value != "-" else None
+
+
+def get_worktree_blobs(repo_root: Path, pathspec: str) -> dict[str, str | None] | None:
     try:
-        result = subprocess.run(
-            ["git", "diff", "--name-status", commit_ref],
+        staged = subprocess.run(
+            ["git", "ls-files", "-z", "--stage", "--", pathspec],
             capture_output=True,
             text=True,
             check=True,
             cwd=repo_root,
         )
-        for line in result.stdout.splitlines():
-            if not line.strip():
-                continue
-            parts = line.split("\t")
-            status = parts[0][0]
-            if status == "R" and len(parts) >= 3:
-                old_path, new_path = parts[1], parts[2]
-                status_map[new_path] = (status, old_path)
-            elif len(parts) >= 2:
-                status_map[parts[1]] = (status, None)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return []
+        dirty = subprocess.run(
+            ["git", "ls-files", "-z", "--modified", "--others", "--", pathspec],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=repo_root,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError, UnicodeDecodeError):
+        return None
+    blobs: dict[str, str | None] = {}
+    for record in staged.stdout.split("\0"):
+        if not record:
+            continue
+        info, _, path = record.partition("\t")
+        mode, blob, stage = info.split(" ")
+        if mode == GITLINK_MODE:
+            blobs[path + "/"] = None
+            continue
+        blobs[path] = blob if stage == "0" and mode != SYMLINK_MODE else None
+    for path in dirty.stdout.split("\0"):
+        if path and path + "/" not in blobs:
+            blobs[path] = None
+    return blobs
 
-    stats_map: dict[str, tuple[int | None, int | None]] = {}
+
+def get_repo_files(repo_root: Path) -> list[str] | None:
     try:
         result = subprocess.run(
-            ["git", "diff", "--numstat", commit_ref],
+            ["git", "ls-files", "-z", "-t", "--cached", "--deleted", "--others", "--exclude-standard"],
             capture_output=True,
             text=True,
             check=True,
             cwd=repo_root,
         )
-        for line in result.stdout.splitlines():
-            if not line.strip():
-                continue
-            parts = line.split("\t")
-            if len(parts) >= 3:
-                added = int(parts[0]) if parts[0] != "-" else None
-                removed = int(parts[1]) if parts[1] != "-" else None
-                path = parts[2]
-                if " => " in path:
-                    path = path.split(" => ")[-1].rstrip("}")
-                    if "{" in parts[2]:
-                        prefix = parts[2].split("{")[0]
-                        path = prefix + path
-                stats_map[path] = (added, removed)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        pass
-
-    changes = []
-    for path, (status, old_path) in status_map.items():
-        added, removed = stats_map.get(path, (None, None))
-        changes.append(FileChange(path, status, added, removed, old_path))
-    return changes
+    except (subprocess.CalledProcessError, FileNotFoundError, UnicodeDecodeError):
+        return None
+    files: set[str] = set()
+    deleted: set[str] = set()
+    for record in result.stdout.split("\0"):
+        if not record:
+            continue
+        tag, _, path = record.partition(" ")
+        (deleted if tag == DELETED_TAG else files).add(path)
+    return sorted(files - deleted)
 
 
 def get_file_history(repo_root: Path, file_path: str, limit: int = 20) -> list[dict]:
@@ -151,33 +202,152 @@ def get_file_history(repo_root: Path, file_path: str, limit: int = 20) -> list[d
                 continue
             parts = line.split("\x00", 4)
             if len(parts) >= 5:
-                commits.append(
-                    {
-                        "hash": parts[0],
-                        "short": parts[1],
-                        "message": parts[2],
-                        "date": parts[3],
-                        "author": parts[4],
-                    }
-                )
+                commits.append(_history_entry(parts))
         return commits
     except (subprocess.SubprocessError, FileNotFoundError, OSError):
         return []
 
 
-def get_file_at_commit(repo_root: Path, file_path: str, commit: str) -> str | None:
+def get_bulk_file_history(repo_root: Path, path: str, limit: int = 20) -> dict[str, list[dict]]:
     try:
         result = subprocess.run(
-            ["git", "show", f"{commit}:{file_path}"],
+            [
+                "git",
+                "log",
+                "-z",
+                "--no-renames",
+                "--name-only",
+                "--pretty=format:%H%x1f%h%x1f%s%x1f%ai%x1f%an",
+                "--",
+                f":(literal){path}",
+            ],
             cwd=repo_root,
             capture_output=True,
             text=True,
         )
-        if result.returncode == 0:
-            return result.stdout
-        return None
     except (subprocess.SubprocessError, FileNotFoundError, OSError):
-        return None
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    history: dict[str, list[dict]] = {}
+    entry: dict | None = None
+    for token in result.stdout.split("\x00"):
+        if not token:
+            entry = None
+            continue
+        if entry is None:
+            header, _, token = token.partition("\n")
+            parts = header.split("\x1f", 4)
+            if len(parts) < 5 or not token:
+                continue
+            entry = _history_entry(parts)
+        if not fnmatch.fnmatchcase(token, MARKDOWN_GLOB):
+            continue
+        commits = history.setdefault(token, [])
+        if len(commits) < limit:
+            commits.append(entry)
+    return history
+
+
+def _history_entry(parts: list[str]) -> dict:
+    return {
+        "hash": parts[0],
+        "short": parts[1],
+        "message": parts[2],
+        "date": parts[3],
+        "author": parts[4],
+    }
+
+
+class BulkHistory:
+    def __init__(self, repo_root: Path, path: str, limit: int = 20):
+        self.repo_root = repo_root
+        self.path = path
+        self.limit = limit
+        self._head: str | None = None
+        self._history: dict[str, list[dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self) -> dict[str, list[dict]]:
+        head = get_current_commit(self.repo_root)
+        with self._lock:
+            if head is None:
+                return {}
+            if head != self._head:
+                self._history = get_bulk_file_history(self.repo_root, self.path, self.limit)
+                self._head = head
+            return self._history
+
+
+class BlobReader:
+    def __init__(self, repo_root: Path, cache_size: int = BLOB_CACHE_SIZE):
+        self.repo_root = repo_root
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, str | None] = OrderedDict()
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen[bytes] | None = None
+
+    def read(self, file_path: str, commit: str) -> str | None:
+        spec = f"{commit}:{file_path}"
+        if "\n" in spec:
+            return None
+        cacheable = _is_object_id(commit)
+        with self._lock:
+            if cacheable and spec in self._cache:
+                self._cache.move_to_end(spec)
+                return self._cache[spec]
+            content = self._query(spec)
+            if cacheable:
+                self._cache[spec] = content
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return content
+
+    def _query(self, spec: str) -> str | None:
+        try:
+            proc = self._process()
+            proc.stdin.write(spec.encode("utf-8") + b"\n")
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) != 3 or not header[2].isdigit():
+                return None
+            data = proc.stdout.read(int(header[2]) + 1)[:-1]
+        except (OSError, ValueError, AttributeError):
+            self._close_process()
+            return None
+        if header[1] != b"blob":
+            return None
+        return data.decode("utf-8", errors="replace")
+
+    def _process(self) -> subprocess.Popen[bytes]:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def _close_process(self) -> None:
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=1)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            proc.kill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_process()
+
+
+def _is_object_id(commit: str) -> bool:
+    return len(commit) >= SHORT_OBJECT_ID_LENGTH and all(char in HEX_DIGITS for char in commit.lower())
 
 
 class CommitInfo(NamedTuple):
@@ -186,68 +356,50 @@ class CommitInfo(NamedTuple):
     message: str
 
 
-def get_commits_in_range(commit_ref: str, repo_root: Path) -> list[CommitInfo]:
-    try:
-        result = subprocess.run(
-            ["git", "log", f"{commit_ref}..HEAD", "--pretty=format:%H%x00%h%x00%s"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        commits = []
-        for line in result.stdout.strip().splitlines():
-            if not line:
-                continue
-            parts = line.split("\x00", 2)
-            if len(parts) >= 3:
-                commits.append(CommitInfo(parts[0], parts[1], parts[2]))
-        return commits
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return []
+class RangeLog(NamedTuple):
+    commits: list[CommitInfo]
+    tags: list[str]
+    merged_branches: list[str]
 
 
-def get_tags_in_range(commit_ref: str, repo_root: Path) -> list[str]:
+def get_range_log(commit_ref: str, repo_root: Path) -> RangeLog:
+    commits: list[CommitInfo] = []
+    tags: list[str] = []
+    merged_branches: list[str] = []
     try:
-        result = subprocess.run(
-            ["git", "log", f"{commit_ref}..HEAD", "--pretty=format:%D"],
+        with subprocess.Popen(
+            ["git", "log", f"{commit_ref}..HEAD", "--pretty=format:%H%x00%h%x00%P%x00%D%x00%s"],
             cwd=repo_root,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            check=True,
-        )
-        tags = []
-        for line in result.stdout.strip().splitlines():
-            if not line:
-                continue
-            for ref in line.split(", "):
-                if ref.startswith("tag: "):
-                    tags.append(ref[5:])
-        return tags
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return []
+        ) as proc:
+            for line in proc.stdout or ():
+                parts = line.rstrip("\n").split("\x00", 4)
+                if len(parts) < 5:
+                    continue
+                commit_hash, short, parents, decorations, subject = parts
+                commits.append(CommitInfo(commit_hash, short, subject))
+                if decorations:
+                    tags.extend(ref[5:] for ref in decorations.split(", ") if ref.startswith("tag: "))
+                if len(parents.split()) > 1:
+                    branch = _merged_branch(subject)
+                    if branch is not None:
+                        merged_branches.append(branch)
+        if proc.returncode != 0:
+            return RangeLog([], [], [])
+    except (subprocess.SubprocessError, FileNotFoundError, OSError):
+        return RangeLog([], [], [])
+    return RangeLog(commits, tags, merged_branches)
 
 
-def get_merged_branches_in_range(commit_ref: str, repo_root: Path) -> list[str]:
-    try:
-        result = subprocess.run(
-            ["git", "log", f"{commit_ref}..HEAD", "--merges", "--pretty=format:%s"],
-            cwd=repo_root,
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        branches = []
-        for line in result.stdout.strip().splitlines():
-            if not line:
-                continue
-            if "Merge branch '" in line:
-                start = line.find("'") + 1
-                end = line.find("'", start)
-                if start > 0 and end > start:
-                    branches.append(line[start:end])
-            elif "Merge pull request" in line:
-                branches.append(line)
-        return branches
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return []
+def _merged_branch(subject: str) -> str | None:
+    if "Merge branch '" in subject:
+        start = subject.find("'") + 1
+        end = subject.find("'", start)
+        if start > 0 and end > start:
+            return subject[start:end]
+        return None
+    if "Merge pull request" in subject:
+        return subject
+    return None
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Collection, Iterator, Mapping, NamedTuple
+
+ID_TYPECODE = "i"
+
+
+class LevelResult(NamedTuple):
+    levels: list[list[Path]]
+    circular: list[tuple[Path, Path]]
+    cycles: list[list[Path]]
+
+
+class DocGraph:
+    __slots__ = ("docs", "ids", "forward_offsets", "forward_targets", "reverse_offsets", "reverse_targets")
+
+    def __init__(
+        self,
+        docs: list[Path],
+        ids: dict[Path, int],
+        forward_offsets: array,
+        forward_targets: array,
+        reverse_offsets: array,
+        reverse_targets: array,
+    ):
+        self.docs = docs
+        self.ids = ids
+        self.forward_offsets = forward_offsets
+        self.forward_targets = forward_targets
+        self.reverse_offsets = reverse_offsets
+        self.reverse_targets = reverse_targets
+
+    @classmethod
+    def from_adjacency(cls, docs: list[Path], adjacency: list[list[int]]) -> DocGraph:
+        reverse: list[list[int]] = [[] for _ in docs]
+        for doc_id, targets in enumerate(adjacency):
+            for target in targets:
+                reverse[target].append(doc_id)
+        ids = {doc: doc_id for doc_id, doc in enumerate(docs)}
+        return cls(docs, ids, *_to_csr(adjacency), *_to_csr(reverse))
+
+    @classmethod
+    def from_deps(cls, deps: dict[Path, list[Path]]) -> DocGraph:
+        ids: dict[Path, int] = {doc: doc_id for doc_id, doc in enumerate(deps)}
+        adjacency: list[list[int]] = []
+        for targets in deps.values():
+            row = []
+            for target in targets:
+                target_id = ids.get(target)
+                if target_id is None:
+                    target_id = ids[target] = len(ids)
+                row.append(target_id)
+            adjacency.append(row)
+        adjacency.extend([] for _ in range(len(ids) - len(adjacency)))
+        return cls.from_adjacency(list(ids), adjacency)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def forward(self, doc_id: int) -> array:
+        return self.forward_targets[self.forward_offsets[doc_id] : self.forward_offsets[doc_id + 1]]
+
+    def reverse(self, doc_id: int) -> array:
+        return self.reverse_targets[self.reverse_offsets[doc_id] : self.reverse_offsets[doc_id + 1]]
+
+    def reversed(self) -> DocGraph:
+        return DocGraph(
+            self.docs, self.ids, self.reverse_offsets, self.reverse_targets, self.forward_offsets, self.forward_targets
+        )
+
+    def cycles_within(self, members: bytearray) -> list[list[int]]:
+        offsets = self.forward_offsets
+        targets = self.forward_targets
+        count = len(self.docs)
+        order = [-1] * count
+        lowlink = [0] * count
+        on_stack = bytearray(count)
+        stack: list[int] = []
+        cycles: list[list[int]] = []
+        visited = 0
+        for root, is_member in enumerate(members):
+            if not is_member or order[root] != -1:
+                continue
+            order[root] = lowlink[root] = visited
+            visited += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(targets[offsets[root] : offsets[root + 1]]))]
+            while work:
+                doc, deps = work[-1]
+                for dep in deps:
+                    if not members[dep]:
+                        continue
+                    if order[dep] == -1:
+                        order[dep] = lowlink[dep] = visited
+                        visited += 1
+                        stack.append(dep)
+                        on_stack[dep] = 1
+                        work.append((dep, iter(targets[offsets[dep] : offsets[dep + 1]])))
+                        break
+                    if on_stack[dep]:
+                        lowlink[doc] = min(lowlink[doc], order[dep])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[doc])
+                    if lowlink[doc] == order[doc]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component.append(member)
+                            if member == doc:
+                                break
+                        if len(component) > 1 or doc in self.forward(doc):
+                            cycles.append(sorted(component, key=self.docs.__getitem__))
+        return sorted(cycles, key=lambda cycle: self.docs[cycle[0]])
+
+    def compute_levels(self) -> LevelResult:
+        docs = self.docs
+        count = len(docs)
+        offsets = self.forward_offsets
+        targets = self.forward_targets
+        order = [-1] * count
+        lowlink = [0] * count
+        assigned = [0] * count
+        on_path = bytearray(count)
+        on_scc_stack = bytearray(count)
+        scc_stack: list[int] = []
+        circular: list[tuple[int, int]] = []
+        cycles: list[list[int]] = []
+        visited = 0
+
+        def enter(doc: int) -> tuple[int, Iterator[int]]:
+            nonlocal visited
+            order[doc] = lowlink[doc] = visited
+            visited += 1
+            on_path[doc] = 1
+            scc_stack.append(doc)
+            on_scc_stack[doc] = 1
+            return doc, iter(targets[offsets[doc] : offsets[doc + 1]])
+
+        for root in sorted(range(count), key=lambda doc_id: str(docs[doc_id])):
+            if order[root] != -1:
+                continue
+            work = [enter(root)]
+            while work:
+                doc, deps = work[-1]
+                for dep in deps:
+                    if order[dep] == -1:
+                        work.append(enter(dep))
+                        break
+                    if on_path[dep]:
+                        circular.append((doc, dep))
+                        lowlink[doc] = min(lowlink[doc], order[dep])
+                        continue
+                    if on_scc_stack[dep]:
+                        lowlink[doc] = min(lowlink[doc], order[dep])
+                    assigned[doc] = max(assigned[doc], assigned[dep] + 1)
+                else:
+                    work.pop()
+                    on_path[doc] = 0
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[doc])
+                        assigned[parent] = max(assigned[parent], assigned[doc] + 1)
+                    if lowlink[doc] == order[doc]:
+                        component = []
+                        while True:
+                            member = scc_stack.pop()
+                            on_scc_stack[member] = 0
+                            component.append(member)
+                            if member == doc:
+                                break
+                        if len(component) > 1 or doc in self.forward(doc):
+                            cycles.append(component)
+
+        ranked = sorted(range(count), key=docs.__getitem__)
+        rank = [0] * count
+        for position, doc_id in enumerate(ranked):
+            rank[doc_id] = position
+        levels: list[list[Path]] = [[] for _ in range(max(assigned, default=0) + 1)]
+        for doc_id in ranked:
+            levels[assigned[doc_id]].append(docs[doc_id])
+        return LevelResult(
+            levels=levels,
+            circular=[(docs[doc], docs[dep]) for doc, dep in circular],
+            cycles=[[docs[member] for member in sorted(component, key=rank.__getitem__)] for component in cycles],
+        )
+
+
+class ForwardDeps(Mapping[Path, "list[Path]"]):
+    __slots__ = ("graph", "members")
+
+    def __init__(self, graph: DocGraph, members: Collection[Path]):
+        self.graph = graph
+        self.members = members
+
+    def __getitem__(self, doc: Path) -> list[Path]:
+        if doc not in self.members:
+            raise KeyError(doc)
+        docs = self.graph.docs
+        return [docs[dep] for dep in self.graph.forward(self.graph.ids[doc])]
+
+    def __iter__(self) -> Iterator[Path]:
+        return iter(self.members)
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class ReverseDeps(Mapping[Path, "list[Path]"]):
+    __slots__ = ("graph",)
+
+    def __init__(self, graph: DocGraph):
+        self.graph = graph
+
+    def __getitem__(self, doc: Path) -> list[Path]:
+        doc_id = self.graph.ids.get(doc)
+        dependents = self.graph.reverse(doc_id) if doc_id is not None else None
+        if not dependents:
+            raise KeyError(doc)
+        docs = self.graph.docs
+        return [docs[dependent] for dependent in dependents]
+
+    def __iter__(self) -> Iterator[Path]:
+        offsets = self.graph.reverse_offsets
+        docs = self.graph.docs
+        return (docs[doc_id] for doc_id in range(len(docs)) if offsets[doc_id + 1] > offsets[doc_id])
+
+    def __len__(self) -> int:
+        offsets = self.graph.reverse_offsets
+        return sum(1 for doc_id in range(len(self.graph.docs)) if offsets[doc_id + 1] > offsets[doc_id])
+
+
+def _to_csr(adjacency: list[list[int]]) -> tuple[array, array]:
+    offsets = array(ID_TYPECODE, [0])
+    targets = array(ID_TYPECODE)
+    for row in adjacency:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+
+from doctrace.core.constants import EXISTS_CACHE_SIZE, GIT_DIR
+from doctrace.core.git import get_repo_files
+
+GLOB_CHARS = ("*", "?")
+
+
+def is_glob(ref: str) -> bool:
+    return any(char in ref for char in GLOB_CHARS)
+
+
+def translate_glob(pattern: str) -> str:
+    parts = pattern.rstrip("/").split("/")
+    if pattern.endswith("/"):
+        parts.append("**")
+    regex = []
+    for i, part in enumerate(parts):
+        is_last = i == len(parts) - 1
+        if part == "**":
+            regex.append(".+" if is_last else "(?:[^/]+/)*")
+        else:
+            regex.append(_translate_component(part) if is_last else _translate_component(part) + "/")
+    return "".join(regex)
+
+
+def _translate_component(part: str) -> str:
+    regex = []
+    i, n = 0, len(part)
+    while i < n:
+        char = part[i]
+        i += 1
+        if char == "*":
+            if not regex or regex[-1] != "[^/]*":
+                regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            j = i
+            if j < n and part[j] == "!":
+                j += 1
+            if j < n and part[j] == "]":
+                j += 1
+            j = part.find("]", j)
+            if j == -1:
+                regex.append("\\[")
+                continue
+            stuff = part[i:j].replace("\\", "\\\\")
+            i = j + 1
+            if stuff.startswith("!"):
+                stuff = "^/" + stuff[1:]
+            elif stuff.startswith("^"):
+                stuff = "\\" + stuff
+            regex.append(f"[{stuff}]")
+        else:
+            regex.append(re.escape(char))
+    return "".join(regex)
+
+
+def _literal_prefix(pattern: str) -> list[str]:
+    prefix = []
+    for part in pattern.split("/")[:-1]:
+        if is_glob(part) or "[" in part:
+            break
+        prefix.append(part)
+    return prefix
+
+
+class _TrieNode:
+    __slots__ = ("children", "refs", "globs", "glob_filter")
+
+    def __init__(self):
+        self.children: dict[str, _TrieNode] = {}
+        self.refs: list[str] = []
+        self.globs: list[tuple[str, re.Pattern[str]]] = []
+        self.glob_filter: re.Pattern[str] | None = None
+
+
+class SourceIndex:
+    def __init__(self, source_to_docs: dict[str, list[Path]]):
+        self.source_to_docs = source_to_docs
+        self._order = {ref: i for i, ref in enumerate(source_to_docs)}
+        self._root = _TrieNode()
+        glob_nodes: dict[int, _TrieNode] = {}
+        for ref in source_to_docs:
+            if is_glob(ref):
+                node = self._node_for(_literal_prefix(ref))
+                node.globs.append((ref, re.compile(translate_glob(ref))))
+                glob_nodes[id(node)] = node
+            elif ref.endswith("/"):
+                self._node_for(ref.split("/")[:-1]).refs.append(ref)
+        for node in glob_nodes.values():
+            node.glob_filter = re.compile("|".join(f"(?:{pattern.pattern})" for _, pattern in node.globs))
+
+    def _node_for(self, parts: list[str]) -> _TrieNode:
+        node = self._root
+        for part in parts:
+            node = node.children.setdefault(part, _TrieNode())
+        return node
+
+    def match_patterns(self, changed: str) -> list[str]:
+        matched: list[str] = []
+        node = self._root
+        self._match_globs(node, changed, matched)
+        for part in changed.split("/")[:-1]:
+            node = node.children.get(part)
+            if node is None:
+                break
+            matched.extend(node.refs)
+            self._match_globs(node, changed, matched)
+        if len(matched) > 1:
+            matched.sort(key=self._order.__getitem__)
+        return matched
+
+    @staticmethod
+    def _match_globs(node: _TrieNode, changed: str, matched: list[str]) -> None:
+        if node.glob_filter is None or not node.glob_filter.fullmatch(changed):
+            return
+        matched.extend(ref for ref, pattern in node.globs if pattern.fullmatch(changed))
+
+    def match(self, changed: str) -> list[str]:
+        matched = [changed] if changed in self.source_to_docs else []
+        matched.extend(self.match_patterns(changed))
+        return matched
+
+
+class RepoFiles:
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self._git_files: list[str] | None = None
+        self._git_loaded = False
+        self._files: list[str] | None = None
+        self._walks: dict[str, list[str]] = {}
+        self._listed_paths: set[str] | None = None
+        self._glob_results: dict[str, bool] = {}
+        self._stat_exists = lru_cache(maxsize=EXISTS_CACHE_SIZE)(self._path_exists)
+
+    @property
+    def git_files(self) -> list[str] | None:
+        if not self._git_loaded:
+            self._git_files = get_repo_files(self.repo_root)
+            self._git_loaded = True
+        return self._git_files
+
+    @property
+    def files(self) -> list[str]:
+        if self._files is None:
+            git_files = self.git_files
+            if git_files is None:
+                git_files = [path for path in self._walked_paths([]) if not path.endswith("/")]
+            self._files = git_files
+        return self._files
+
+    def exists(self, path: str) -> bool:
+        if self._listed_paths is None:
+            self._listed_paths = _with_parent_dirs(self.git_files or [])
+        if path.rstrip("/") in self._listed_paths:
+            return True
+        return self._stat_exists(path)
+
+    def _path_exists(self, path: str) -> bool:
+        return (self.repo_root / path).exists()
+
+    def glob_matches(self, pattern: str) -> bool:
+        if pattern not in self._glob_results:
+            if self.git_files is not None and self._listing_matches(pattern):
+                self._glob_results[pattern] = True
+            else:
+                self._glob_results[pattern] = self._walk_matches(pattern)
+        return self._glob_results[pattern]
+
+    def _listing_matches(self, pattern: str) -> bool:
+        regex = re.compile(translate_glob(pattern))
+        prefix = "".join(f"{part}/" for part in _literal_prefix(pattern))
+        files = self.files
+        for i in range(bisect_left(files, prefix), len(files)):
+            path = files[i]
+            if not path.startswith(prefix):
+                break
+            if regex.fullmatch(path) and self._stat_exists(path):
+                return True
+        return False
+
+    def _walk_matches(self, pattern: str) -> bool:
+        dirs_only = pattern.endswith("/")
+        regex = re.compile(translate_glob(pattern.rstrip("/")))
+        parts = _literal_prefix(pattern)
+        prefix = "".join(f"{part}/" for part in parts)
+        paths = self._walked_paths(parts)
+        for i in range(bisect_left(paths, prefix), len(paths)):
+            path = paths[i]
+            if not path.startswith(prefix):
+                break
+            if (path.endswith("/") or not dirs_only) and regex.fullmatch(path.rstrip("/")):
+                return True
+        return False
+
+    def _walked_paths(self, parts: list[str]) -> list[str]:
+        for depth in range(len(parts) + 1):
+            walked = self._walks.get("".join(f"{part}/" for part in parts[:depth]))
+            if walked is not None:
+                return walked
+        prefix = "".join(f"{part}/" for part in parts)
+        self._walks[prefix] = _walk_paths(self.repo_root, prefix)
+        return self._walks[prefix]
+
+
+def _with_parent_dirs(files: list[str]) -> set[str]:
+    paths = set(files)
+    for path in files:
+        parent = path.rpartition("/")[0]
+        while parent and parent not in paths:
+            paths.add(parent)
+            parent = parent.rpartition("/")[0]
+    return paths
+
+
+def _walk_paths(repo_root: Path, prefix: str = "") -> list[str]:
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(repo_root / prefix):
+        if GIT_DIR in dirnames:
+            dirnames.remove(GIT_DIR)
+        rel_dir = Path(dirpath).relative_to(repo_root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        paths.extend(prefix + name + "/" for name in dirnames)
+        paths.extend(prefix + name for name in filenames)
+    return sorted(paths)
@@ -2,8 +2,9 @@ import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
-from doctrace.commands.affected import _filter_docs, _find_direct_hits, _propagate, find_affected_docs
+from doctrace.commands.affected import _filter_docs, _find_direct_hits, _format_cycle, _propagate, find_affected_docs
 from doctrace.core.config import Config
+from doctrace.core.graph import DocGraph
 
 
 def test_propagate():
@@ -14,7 +15,7 @@ def test_propagate():
         doc1: [doc2],
         doc2: [doc3],
     }
-    cascade_hits, circular, chains = _propagate([doc1], doc_to_docs)
+    cascade_hits, circular, chains = _propagate([doc1], DocGraph.from_deps(doc_to_docs))
     assert doc2 in cascade_hits
     assert doc3 in cascade_hits
 
@@ -28,9 +29,24 @@ def test_propagate_detects_circular():
         doc2: [doc3],
         doc3: [doc2],
     }
-    cascade_hits, circular, chains = _propagate([doc1], doc_to_docs)
-    assert len(circular) > 0
-    assert (doc2, doc3) in circular or (doc3, doc2) in circular
+    cascade_hits, circular, chains = _propagate([doc1], DocGraph.from_deps(doc_to_docs))
+    assert circular == [[doc2, doc3]]
+
+
+def test_propagate_detects_longer_cycles():
+    doc1, doc2, doc3, doc4 = (Path(f"/docs/doc{n}.md") for n in range(1, 5))
+    doc_to_docs = {
+        doc1: [doc2],
+        doc2: [doc3],
+        doc3: [doc4],
+        doc4: [doc2],
+    }
+    cascade_hits, circular, chains = _propagate([doc1], DocGraph.from_deps(doc_to_docs))
+    assert circular == [[doc2, doc3, doc4]]
+    assert _format_cycle(["docs/doc2.md", "docs/doc3.md", "docs/doc4.md"]) == (
+        "cycle among: docs/doc2.md, docs/doc3.md, docs/doc4.md"
+    )
+    assert _format_cycle(["docs/doc2.md", "docs/doc3.md"]) == "docs/doc2.md <-> docs/doc3.md"
 
 
 def test_find_affected_docs_no_changes():
@@ -102,3 +118,11 @@ def test_filter_docs_no_patterns():
         docs = [repo_root / "docs/a.md", repo_root / "docs/b.md"]
         filtered = _filter_docs(docs, repo_root, [])
         assert filtered == docs
+
+
+def test_find_direct_hits_glob_match():
+    doc1 = Path("/docs/doc1.md")
+    source_to_docs = {"src/booking/**/*.ts": [doc1]}
+    hits, matches = _find_direct_hits(["src/booking/commands/handler.ts", "src/other.ts"], source_to_docs)
+    assert hits == [doc1]
+    assert matches == {"src/booking/**/*.ts": [doc1]}
@@ -1,10 +1,12 @@
+import json
 import shutil
 import tempfile
 from pathlib import Path
 from unittest.mock import patch
 
-from doctrace.commands.affected import find_affected_docs
+from doctrace.commands.affected import find_affected_docs, run
 from doctrace.core.config import Config
+from doctrace.core.git import FileChange
 
 DOCS_DIR = Path(__file__).parent / "docs"
 
@@ -19,3 +21,27 @@ def test_find_affected_docs_with_changes():
             result = find_affected_docs(docs_dir, "HEAD~1", config, repo_root=tmppath)
         assert len(result.direct_hits) == 1
         assert result.direct_hits[0] == docs_dir / "test.md"
+
+
+def test_affected_ignore_keeps_only_fully_kept_cycles(capsys, monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / ".git").mkdir()
+        docs_dir = tmppath / "docs"
+        (docs_dir / "skip").mkdir(parents=True)
+        (docs_dir / "src.md").write_text("---\nsources:\n  - src/changed.py: impl\n---\n\n# Src\n")
+        (docs_dir / "a.md").write_text("---\nrequired_docs:\n  - docs/src.md: desc\n  - docs/b.md: desc\n---\n\n# A\n")
+        (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\n# B\n")
+        (docs_dir / "c.md").write_text("---\nrequired_docs:\n  - docs/skip/x.md: desc\n---\n\n# C\n")
+        (docs_dir / "skip" / "x.md").write_text(
+            "---\nrequired_docs:\n  - docs/src.md: desc\n  - docs/c.md: desc\n---\n\n# X\n"
+        )
+        monkeypatch.chdir(tmppath)
+        changes = [FileChange("src/changed.py", "M", 1, 0)]
+        with (
+            patch("doctrace.commands.affected.resolve_commit_ref", return_value="HEAD~1"),
+            patch("doctrace.commands.affected.get_changed_files_detailed", return_value=changes),
+        ):
+            run(docs_dir, output_json=True, ignore_patterns=["docs/skip/*"])
+        data = json.loads(capsys.readouterr().out)
+        assert data["circular_refs"] == [["docs/a.md", "docs/b.md"]]
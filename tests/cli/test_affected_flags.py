@@ -22,7 +22,7 @@ def test_affected_last_passes_arguments_to_run():
             with pytest.raises(SystemExit) as exc:
                 main()
     assert exc.value.code == 0
-    run_mock.assert_called_once_with(Path("docs"), 5, None, None, False, [])
+    run_mock.assert_called_once_with(Path("docs"), 5, None, None, False, [], None)
 
 
 def test_affected_json_flag():
@@ -31,7 +31,7 @@ def test_affected_json_flag():
             with pytest.raises(SystemExit) as exc:
                 main()
     assert exc.value.code == 0
-    run_mock.assert_called_once_with(Path("docs"), 1, None, None, True, [])
+    run_mock.assert_called_once_with(Path("docs"), 1, None, None, True, [], None)
 
 
 def test_affected_since_flag():
@@ -40,7 +40,7 @@ def test_affected_since_flag():
             with pytest.raises(SystemExit) as exc:
                 main()
     assert exc.value.code == 0
-    run_mock.assert_called_once_with(Path("docs"), None, None, "v1.0.0", False, [])
+    run_mock.assert_called_once_with(Path("docs"), None, None, "v1.0.0", False, [], None)
 
 
 def test_affected_ignore_flag():
@@ -49,7 +49,7 @@ def test_affected_ignore_flag():
             with pytest.raises(SystemExit) as exc:
                 main()
     assert exc.value.code == 0
-    run_mock.assert_called_once_with(Path("docs"), 1, None, None, False, ["docs/index.md"])
+    run_mock.assert_called_once_with(Path("docs"), 1, None, None, False, ["docs/index.md"], None)
 
 
 def test_affected_multiple_ignore_flags():
@@ -62,4 +62,20 @@ def test_affected_multiple_ignore_flags():
             with pytest.raises(SystemExit) as exc:
                 main()
     assert exc.value.code == 0
-    run_mock.assert_called_once_with(Path("docs"), 1, None, None, False, ["docs/a.md", "docs/b.md"])
+    run_mock.assert_called_once_with(Path("docs"), 1, None, None, False, ["docs/a.md", "docs/b.md"], None)
+
+
+def test_affected_jobs_flag():
+    with patch("doctrace.cli.affected.run", return_value=0) as run_mock:
+        with patch.object(sys, "argv", ["doctrace", "affected", "docs/", "--last", "1", "--jobs", "4"]):
+            with pytest.raises(SystemExit) as exc:
+                main()
+    assert exc.value.code == 0
+    run_mock.assert_called_once_with(Path("docs"), 1, None, None, False, [], 4)
+
+
+def test_affected_jobs_must_be_positive():
+    with patch.object(sys, "argv", ["doctrace", "affected", "docs/", "--last", "1", "--jobs", "0"]):
+        with pytest.raises(SystemExit) as exc:
+            main()
+    assert exc.value.code == 2
@@ -11,3 +11,8 @@ def test_validate_config_invalid_metadata_unknown_key():
     errors = validate_config({"metadata": {"unknown_key": "value"}})
     assert len(errors) == 1
     assert "unknown key" in errors[0]
+
+
+def test_validate_config_invalid_cache_dir():
+    errors = validate_config({"cache_dir": 1})
+    assert errors == ["cache_dir must be a string"]
@@ -11,3 +11,8 @@ def test_validate_config_metadata():
         {"metadata": {"required_docs_key": "deps", "related_docs_key": "related", "sources_key": "code"}}
     )
     assert errors == []
+
+
+def test_validate_config_cache_dir():
+    errors = validate_config({"cache_dir": ".cache/doctrace"})
+    assert errors == []
@@ -0,0 +1,206 @@
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from doctrace.core.cache import git_blob_hash, load_doc_cache, resolve_cache_path
+from doctrace.core.config import Config
+from doctrace.core.docs import build_doc_index
+from doctrace.core.git import get_worktree_blobs
+
+
+def _create_repo(tmppath: Path) -> Path:
+    (tmppath / ".git").mkdir()
+    return _create_repo_docs(tmppath)
+
+
+def _create_repo_docs(tmppath: Path) -> Path:
+    docs_dir = tmppath / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "a.md").write_text("---\nsources:\n  - src/a.py: desc\n---\n\n# A\n")
+    (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\n# B\n")
+    return docs_dir
+
+
+def test_git_blob_hash_matches_git():
+    assert git_blob_hash(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+    assert git_blob_hash(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_resolve_cache_path_without_git_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        assert resolve_cache_path(Path(tmpdir), Config({})) is None
+
+
+def test_resolve_cache_path_custom_dir():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        cache_path = resolve_cache_path(tmppath, Config({"cache_dir": ".cache"}))
+        assert cache_path is not None
+        assert cache_path.parent == tmppath / ".cache"
+
+
+def test_build_doc_index_reuses_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        config = Config({})
+        first = build_doc_index(docs_dir, config, tmppath)
+        assert resolve_cache_path(tmppath, config).exists()
+        with patch("doctrace.core.docs.parse_doc") as mock_parse:
+            second = build_doc_index(docs_dir, config, tmppath)
+            mock_parse.assert_not_called()
+        assert second.parsed_cache == first.parsed_cache
+        assert second.source_to_docs == first.source_to_docs
+
+
+def test_build_doc_index_reparses_changed_doc():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        config = Config({})
+        build_doc_index(docs_dir, config, tmppath)
+        (docs_dir / "a.md").write_text("---\nsources:\n  - src/other.py: desc\n---\n")
+        index = build_doc_index(docs_dir, config, tmppath)
+        assert "src/other.py" in index.source_to_docs
+        assert "src/a.py" not in index.source_to_docs
+
+
+def test_cache_invalidated_by_metadata_keys():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        build_doc_index(docs_dir, Config({}), tmppath)
+        config = Config({"metadata": {"sources_key": "code"}})
+        assert load_doc_cache(tmppath, config).entries == {}
+        index = build_doc_index(docs_dir, config, tmppath)
+        assert index.source_to_docs == {}
+
+
+def test_cache_prunes_deleted_docs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        config = Config({})
+        build_doc_index(docs_dir, config, tmppath)
+        (docs_dir / "b.md").unlink()
+        build_doc_index(docs_dir, config, tmppath)
+        assert set(load_doc_cache(tmppath, config).entries) == {"docs/a.md"}
+
+
+def test_cache_keeps_ignored_docs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        config = Config({})
+        build_doc_index(docs_dir, config, tmppath)
+        index = build_doc_index(docs_dir, config, tmppath, ignore_patterns=["docs/b.md"])
+        assert list(index.parsed_cache) == [docs_dir / "a.md"]
+        assert set(load_doc_cache(tmppath, config).entries) == {"docs/a.md", "docs/b.md"}
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@test", *args], cwd=cwd, check=True)
+
+
+def _create_git_repo(tmppath: Path) -> Path:
+    _git(tmppath, "init", "-q")
+    docs_dir = _create_repo_docs(tmppath)
+    _git(tmppath, "add", ".")
+    _git(tmppath, "commit", "-q", "-m", "init")
+    return docs_dir
+
+
+def test_get_worktree_blobs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_git_repo(tmppath)
+        (docs_dir / "a.md").write_text("changed\n")
+        (docs_dir / "new.md").write_text("new\n")
+        blobs = get_worktree_blobs(tmppath, "docs")
+        assert blobs["docs/a.md"] is None
+        assert blobs["docs/new.md"] is None
+        assert blobs["docs/b.md"] == git_blob_hash((docs_dir / "b.md").read_bytes())
+
+
+def test_build_doc_index_git_includes_nested_repos():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_git_repo(tmppath)
+        for name in ("nested", "module"):
+            _git(tmppath, "init", "-q", f"docs/{name}")
+            (docs_dir / name / "c.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n")
+        _git(docs_dir / "module", "add", ".")
+        _git(docs_dir / "module", "commit", "-q", "-m", "init")
+        _git(tmppath, "add", "docs/module")
+        blobs = get_worktree_blobs(tmppath, "docs")
+        assert blobs["docs/nested/"] is None
+        assert blobs["docs/module/"] is None
+        config = Config({})
+        discovered = build_doc_index(docs_dir, config, tmppath)
+        walked = build_doc_index(docs_dir, config, tmppath, use_cache=False)
+        assert docs_dir / "nested" / "c.md" in discovered.parsed_cache
+        assert docs_dir / "module" / "c.md" in discovered.parsed_cache
+        assert sorted(discovered.parsed_cache) == sorted(walked.parsed_cache)
+
+
+def test_build_doc_index_uses_git_blobs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_git_repo(tmppath)
+        config = Config({})
+        first = build_doc_index(docs_dir, config, tmppath)
+        entries = load_doc_cache(tmppath, config).entries
+        assert entries["docs/a.md"]["hash"] == git_blob_hash((docs_dir / "a.md").read_bytes())
+        with patch("doctrace.core.docs.parse_doc") as mock_parse:
+            second = build_doc_index(docs_dir, config, tmppath)
+            mock_parse.assert_not_called()
+        assert second.parsed_cache == first.parsed_cache
+        assert second.source_to_docs == first.source_to_docs
+
+
+def test_build_doc_index_git_reparses_unstaged_doc():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_git_repo(tmppath)
+        config = Config({})
+        build_doc_index(docs_dir, config, tmppath)
+        (docs_dir / "a.md").write_text("---\nsources:\n  - src/other.py: desc\n---\n")
+        (docs_dir / "c.md").write_text("---\nsources:\n  - src/c.py: desc\n---\n")
+        index = build_doc_index(docs_dir, config, tmppath)
+        assert set(index.source_to_docs) == {"src/other.py", "src/c.py"}
+
+
+def test_inline_refs_served_from_cache():
+    from doctrace.commands.info import find_undeclared_inline_refs
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\nSee docs/a.md and docs/c.md\n")
+        config = Config({})
+        build_doc_index(docs_dir, config, tmppath, inline_refs=True)
+        with patch("doctrace.core.docs.parse_doc") as mock_parse:
+            index = build_doc_index(docs_dir, config, tmppath, inline_refs=True)
+            mock_parse.assert_not_called()
+        inline_refs = index.parsed_cache[docs_dir / "b.md"].inline_refs
+        assert [(ref.path, ref.line_number) for ref in inline_refs] == [("docs/a.md", 6), ("docs/c.md", 6)]
+        with patch("doctrace.commands.info.read_inline_refs") as mock_extract:
+            undeclared = find_undeclared_inline_refs(index.parsed_cache, tmppath, "docs/", [])
+            mock_extract.assert_not_called()
+        assert undeclared == [(docs_dir / "b.md", "docs/c.md")]
+
+
+def test_cache_reparses_when_inline_refs_requested():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = _create_repo(tmppath)
+        (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\nSee docs/c.md\n")
+        config = Config({})
+        index = build_doc_index(docs_dir, config, tmppath)
+        assert index.parsed_cache[docs_dir / "b.md"].inline_refs is None
+        index = build_doc_index(docs_dir, config, tmppath, inline_refs=True)
+        assert [ref.path for ref in index.parsed_cache[docs_dir / "b.md"].inline_refs] == ["docs/c.md"]
+        with patch("doctrace.core.docs.parse_doc") as mock_parse:
+            index = build_doc_index(docs_dir, config, tmppath)
+            mock_parse.assert_not_called()
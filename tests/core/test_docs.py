@@ -1,8 +1,9 @@
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 from doctrace.core.config import Config
-from doctrace.core.docs import build_dependency_tree, compute_levels
+from doctrace.core.docs import build_dependency_tree, build_doc_index, compute_levels, parse_doc, update_doc_index
 
 
 def _create_doc(path: Path, required_docs: list[str] = None, sources: list[str] = None):
@@ -83,3 +84,152 @@ def test_compute_levels_single_doc():
     assert len(result.levels) == 1
     assert doc in result.levels[0]
     assert result.circular == []
+
+
+def test_build_doc_index_parallel_matches_serial():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        for i in range(150):
+            required = [f"docs/d{i - 1}.md"] if i else None
+            _create_doc(docs_dir / f"d{i}.md", required_docs=required, sources=[f"src/m{i % 7}.py"])
+        config = Config({})
+        serial = build_doc_index(docs_dir, config, tmppath, jobs=1)
+        parallel = build_doc_index(docs_dir, config, tmppath, jobs=2)
+        assert parallel.parsed_cache == serial.parsed_cache
+        assert parallel.source_to_docs == serial.source_to_docs
+        assert parallel.forward_deps == serial.forward_deps
+        assert list(parallel.parsed_cache) == list(serial.parsed_cache)
+
+
+def test_parse_doc_stops_at_frontmatter_end():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        doc = Path(tmpdir) / "doc.md"
+        header = "---\ntitle: Doc\nrequired_docs:\n\n  - docs/a.md: desc\nsources:\n  - src/a.py: desc\n---\n"
+        doc.write_bytes(header.encode() + b"\n# Body\n\xff\xfe not utf-8\n" * 1000)
+        parsed = parse_doc(doc)
+        assert parsed.title == "Doc"
+        assert parsed.required_docs[0].line_number == 5
+        assert parsed.sources[0].line_number == 7
+
+
+def test_parse_doc_collects_inline_refs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        doc = Path(tmpdir) / "doc.md"
+        doc.write_text(
+            "---\nrelated_docs:\n  - docs/a.md: desc\n---\n\nSee docs/a.md, `docs/b.md` and docs/c.md\n"
+            "```\ndocs/d.md\n```\ndocs/a.md again\n"
+        )
+        assert parse_doc(doc).inline_refs is None
+        parsed = parse_doc(doc, inline_refs=True)
+        assert [(ref.path, ref.line_number) for ref in parsed.inline_refs] == [("docs/a.md", 6), ("docs/c.md", 6)]
+        assert parsed.related_docs[0].path == "docs/a.md"
+
+
+def test_parse_doc_inline_refs_skip_fences_and_code_spans():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        doc = Path(tmpdir) / "doc.md"
+        doc.write_text(
+            "---\ntitle: T\n---\n"
+            "~~~\ndocs/a.md\n```\ndocs/b.md\n~~~\n"
+            "````md\n```\ndocs/c.md\n````\n"
+            "``docs/`d`.md`` and `docs/e.md` docs/f.md\n"
+            "a ` stray backtick docs/g.md\n"
+            "```not`a fence docs/h.md\n"
+        )
+        parsed = parse_doc(doc, inline_refs=True)
+        assert [(ref.path, ref.line_number) for ref in parsed.inline_refs] == [
+            ("docs/f.md", 13),
+            ("docs/g.md", 14),
+            ("docs/h.md", 15),
+        ]
+
+
+def test_parse_doc_unclosed_frontmatter():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        doc = Path(tmpdir) / "doc.md"
+        doc.write_text("---\nsources:\n  - src/a.py: desc\n\n# Body\n")
+        parsed = parse_doc(doc)
+        assert parsed.sources == []
+
+
+def test_compute_levels_reports_full_cycle():
+    a, b, c, d = Path("/docs/a.md"), Path("/docs/b.md"), Path("/docs/c.md"), Path("/docs/d.md")
+    result = compute_levels({a: [b], b: [c], c: [a], d: [a]})
+    assert result.cycles == [[a, b, c]]
+    assert len(result.circular) == 1
+    assert d in result.levels[-1]
+
+
+def test_compute_levels_self_reference():
+    a = Path("/docs/a.md")
+    result = compute_levels({a: [a]})
+    assert result.cycles == [[a]]
+    assert result.circular == [(a, a)]
+    assert result.levels == [[a]]
+
+
+def test_compute_levels_long_chain():
+    docs = [Path(f"/docs/{i}.md") for i in range(5000)]
+    doc_deps = {doc: [docs[i - 1]] if i else [] for i, doc in enumerate(docs)}
+    result = compute_levels(doc_deps)
+    assert len(result.levels) == 5000
+    assert result.levels[-1] == [docs[-1]]
+
+
+def _normalized(index):
+    return (
+        index.parsed_cache,
+        {src: sorted(docs) for src, docs in index.source_to_docs.items()},
+        {doc: sorted(deps) for doc, deps in index.forward_deps.items()},
+        {doc: sorted(deps) for doc, deps in index.reverse_deps.items()},
+    )
+
+
+def test_build_doc_index_skips_ignored_docs():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md", required_docs=["docs/gen/b.md"])
+        _create_doc(docs_dir / "gen" / "b.md", required_docs=["docs/gen/c.md"], sources=["src/b.py"])
+        _create_doc(docs_dir / "gen" / "c.md", sources=["src/c.py"])
+        _create_doc(docs_dir / "gen" / "deep" / "d.md", required_docs=["docs/a.md"])
+        _create_doc(docs_dir / "e.md", required_docs=["docs/a.md"])
+        config = Config({})
+        full = build_doc_index(docs_dir, config, tmppath, use_cache=False)
+        for ignore in (["docs/gen/*"], ["docs/gen/*.md", "docs/e.md"]):
+            with patch("doctrace.core.docs.parse_doc", side_effect=parse_doc) as mock_parse:
+                index = build_doc_index(docs_dir, config, tmppath, use_cache=False, ignore_patterns=ignore)
+            parsed = {call.args[0] for call in mock_parse.call_args_list}
+            assert docs_dir / "gen" / "deep" / "d.md" not in parsed
+            assert {docs_dir / "gen" / "b.md", docs_dir / "gen" / "c.md"} <= parsed
+            assert index.forward_deps[docs_dir / "a.md"] == full.forward_deps[docs_dir / "a.md"]
+            assert index.graph.compute_levels().levels[:3] == [
+                [docs_dir / "gen" / "c.md"],
+                [docs_dir / "gen" / "b.md"],
+                [docs_dir / "a.md"],
+            ]
+            assert (docs_dir / "e.md" in parsed) == ("docs/e.md" not in ignore)
+
+
+def test_update_doc_index_matches_rebuild():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md", sources=["src/a.py"])
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md", "docs/c.md"], sources=["src/b.py"])
+        _create_doc(docs_dir / "d.md", required_docs=["docs/b.md"])
+        config = Config({})
+        index = build_doc_index(docs_dir, config, tmppath, use_cache=False)
+
+        _create_doc(docs_dir / "c.md", sources=["src/a.py"])
+        _create_doc(docs_dir / "a.md", required_docs=["docs/d.md"])
+        (docs_dir / "d.md").unlink()
+        changed = [docs_dir / "c.md", docs_dir / "a.md"]
+        index = update_doc_index(index, changed, [docs_dir / "d.md"], config, tmppath)
+
+        rebuilt = build_doc_index(docs_dir, config, tmppath, use_cache=False)
+        assert _normalized(index) == _normalized(rebuilt)
+        assert index.source_index.match("src/a.py") == ["src/a.py"]
+        assert index.forward_deps[docs_dir / "b.md"] == [docs_dir / "a.md", docs_dir / "c.md"]
+        assert index.graph.compute_levels() == rebuilt.graph.compute_levels()
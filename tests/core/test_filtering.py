@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from doctrace.core.filtering import IgnoreMatcher, compile_ignore_patterns, matches_ignore_pattern
+
+
+def test_ignore_matcher_matches_any_pattern():
+    matcher = IgnoreMatcher(["docs/index.md", "docs/api/*", "docs/v[12]/*.md"])
+    assert matcher.matches("docs/index.md")
+    assert matcher.matches("docs/api/nested/ref.md")
+    assert matcher.matches("docs/v2/a.md")
+    assert not matcher.matches("docs/v3/a.md")
+    assert not matcher.matches("docs/other.md")
+    assert not IgnoreMatcher([])
+    assert not IgnoreMatcher([]).matches("docs/index.md")
+
+
+def test_ignore_matcher_relativizes_paths():
+    repo_root = Path("/repo")
+    matcher = compile_ignore_patterns(("docs/generated/*",))
+    assert matcher is compile_ignore_patterns(("docs/generated/*",))
+    assert matcher.matches_path(repo_root / "docs/generated/a.md", repo_root)
+    assert not matcher.matches_path(repo_root / "docs/a.md", repo_root)
+    assert matches_ignore_pattern(repo_root / "docs/generated/a.md", repo_root, ["docs/generated/*"])
+    assert not matches_ignore_pattern(repo_root / "docs/generated/a.md", repo_root, [])
@@ -0,0 +1,163 @@
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from doctrace.core.git import (
+    BlobReader,
+    BulkHistory,
+    FileChange,
+    get_bulk_file_history,
+    get_changed_files,
+    get_changed_files_detailed,
+    get_file_history,
+    get_range_log,
+)
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=test", "-c", "user.email=test@test", *args], cwd=cwd, check=True)
+
+
+def _create_git_repo(tmppath: Path) -> None:
+    _git(tmppath, "init", "-q")
+    (tmppath / "src").mkdir()
+    (tmppath / "src" / "a.py").write_text("".join(f"line {i}\n" for i in range(20)))
+    (tmppath / "src" / "b.py").write_text("b\n")
+    (tmppath / "data.bin").write_bytes(b"\0\1\2")
+    _git(tmppath, "add", ".")
+    _git(tmppath, "commit", "-q", "-m", "init")
+
+
+def test_get_changed_files_detailed_single_diff():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        _git(tmppath, "mv", "src/a.py", "src/renamed a.py")
+        (tmppath / "src" / "renamed a.py").write_text("".join(f"line {i}\n" for i in range(21)))
+        (tmppath / "src" / "b.py").write_text("b\nc\n")
+        (tmppath / "src" / "tab\tname.py").write_text("x\n")
+        (tmppath / "data.bin").write_bytes(b"\0\1\3")
+        _git(tmppath, "add", ".")
+        _git(tmppath, "commit", "-q", "-m", "change")
+
+        changes = {change.path: change for change in get_changed_files_detailed("HEAD~1", tmppath)}
+
+        assert changes["src/renamed a.py"] == FileChange("src/renamed a.py", "R", 1, 0, "src/a.py")
+        assert changes["src/b.py"] == FileChange("src/b.py", "M", 1, 0)
+        assert changes["src/tab\tname.py"] == FileChange("src/tab\tname.py", "A", 1, 0)
+        assert changes["data.bin"] == FileChange("data.bin", "M", None, None)
+        assert sorted(get_changed_files("HEAD~1", tmppath)) == sorted(changes)
+
+
+def test_get_changed_files_detailed_invalid_ref():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        assert get_changed_files_detailed("missing-ref", tmppath) == []
+        assert get_changed_files("missing-ref", tmppath) == []
+
+
+def test_get_range_log_single_walk():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        _git(tmppath, "checkout", "-q", "-b", "feature")
+        (tmppath / "src" / "b.py").write_text("feature\n")
+        _git(tmppath, "commit", "-q", "-am", "feature work")
+        _git(tmppath, "checkout", "-q", "-")
+        _git(tmppath, "merge", "-q", "--no-ff", "feature", "-m", "Merge branch 'feature'")
+        _git(tmppath, "tag", "v1.0.0")
+
+        range_log = get_range_log("HEAD~1", tmppath)
+
+        assert [commit.message for commit in range_log.commits] == ["Merge branch 'feature'", "feature work"]
+        assert all(commit.hash.startswith(commit.short) for commit in range_log.commits)
+        assert range_log.tags == ["v1.0.0"]
+        assert range_log.merged_branches == ["feature"]
+        assert get_range_log("missing-ref", tmppath) == ([], [], [])
+
+
+def _head(tmppath: Path) -> str:
+    return subprocess.run(["git", "rev-parse", "HEAD"], cwd=tmppath, capture_output=True, text=True).stdout.strip()
+
+
+def test_blob_reader_reuses_one_process():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        first = _head(tmppath)
+        (tmppath / "src" / "b.py").write_text("b\nc\n")
+        _git(tmppath, "commit", "-q", "-am", "change")
+        second = _head(tmppath)
+
+        reader = BlobReader(tmppath)
+        try:
+            with patch("doctrace.core.git.subprocess.Popen", wraps=subprocess.Popen) as popen:
+                assert reader.read("src/b.py", first) == "b\n"
+                assert reader.read("src/b.py", second) == "b\nc\n"
+                assert reader.read("src/missing.py", second) is None
+                assert reader.read("src", second) is None
+                assert reader.read("src/b.py", "missing-ref") is None
+                assert reader.read("src/b.py", "HEAD~1") == "b\n"
+                assert popen.call_count == 1
+        finally:
+            reader.close()
+
+
+def test_blob_reader_lru_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        head = _head(tmppath)
+
+        reader = BlobReader(tmppath, cache_size=1)
+        try:
+            assert reader.read("src/b.py", head) == "b\n"
+            with patch.object(reader, "_query") as query:
+                assert reader.read("src/b.py", head) == "b\n"
+                query.assert_not_called()
+            reader.read("src/a.py", head)
+            assert list(reader._cache) == [f"{head}:src/a.py"]
+        finally:
+            reader.close()
+
+
+def test_get_bulk_file_history_matches_per_file_history():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        for i in range(3):
+            (docs_dir / "a.md").write_text(f"a {i}\n")
+            (docs_dir / ("b.md" if i else "c.md")).write_text(f"b {i}\n")
+            (tmppath / "src" / "b.py").write_text(f"b {i}\n")
+            _git(tmppath, "add", ".")
+            _git(tmppath, "commit", "-q", "-m", f"docs {i}")
+
+        history = get_bulk_file_history(tmppath, "docs", limit=2)
+
+        assert sorted(history) == ["docs/a.md", "docs/b.md", "docs/c.md"]
+        for path, commits in history.items():
+            assert commits == get_file_history(tmppath, path, limit=2)
+        assert len(history["docs/a.md"]) == 2
+
+
+def test_bulk_history_cached_by_head():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        _create_git_repo(tmppath)
+        (tmppath / "a.md").write_text("a\n")
+        _git(tmppath, "add", ".")
+        _git(tmppath, "commit", "-q", "-m", "doc")
+
+        bulk_history = BulkHistory(tmppath, ".")
+        with patch("doctrace.core.git.get_bulk_file_history", wraps=get_bulk_file_history) as walk:
+            assert [c["message"] for c in bulk_history.get()["a.md"]] == ["doc"]
+            bulk_history.get()
+            assert walk.call_count == 1
+            (tmppath / "a.md").write_text("b\n")
+            _git(tmppath, "commit", "-q", "-am", "update")
+            assert [c["message"] for c in bulk_history.get()["a.md"]] == ["update", "doc"]
+            assert walk.call_count == 2
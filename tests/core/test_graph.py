@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from doctrace.core.graph import DocGraph, ForwardDeps, ReverseDeps
+
+
+def test_doc_graph_csr_adjacency():
+    a, b, c, d = (Path(f"/docs/{name}.md") for name in "abcd")
+    graph = DocGraph.from_deps({a: [b, c], b: [c], c: [], d: [a, a]})
+    assert graph.docs == [a, b, c, d]
+    assert list(graph.forward_offsets) == [0, 2, 3, 3, 5]
+    assert list(graph.forward(graph.ids[a])) == [graph.ids[b], graph.ids[c]]
+    assert list(graph.reverse(graph.ids[c])) == [graph.ids[a], graph.ids[b]]
+    assert list(graph.reverse(graph.ids[a])) == [graph.ids[d], graph.ids[d]]
+    reverse = graph.reversed()
+    assert list(reverse.forward(graph.ids[c])) == list(graph.reverse(graph.ids[c]))
+    assert reverse.docs is graph.docs
+
+
+def test_doc_graph_interns_dependency_only_docs():
+    a, b = Path("/docs/a.md"), Path("/docs/b.md")
+    graph = DocGraph.from_deps({a: [b]})
+    assert len(graph) == 2
+    assert list(graph.forward(graph.ids[b])) == []
+    result = graph.compute_levels()
+    assert result.levels == [[b], [a]]
+
+
+def test_doc_graph_levels_with_cycle():
+    a, b, c = (Path(f"/docs/{name}.md") for name in "abc")
+    result = DocGraph.from_deps({c: [a], a: [b], b: [a]}).compute_levels()
+    assert result.cycles == [[a, b]]
+    assert result.circular == [(b, a)]
+    assert result.levels[-1] == [c]
+
+
+def test_doc_graph_cycles_within_members():
+    a, b, c, d, e = (Path(f"/docs/{name}.md") for name in "abcde")
+    graph = DocGraph.from_deps({a: [b], b: [c], c: [a, a], d: [e], e: [d, e]})
+    ids = graph.ids
+    everything = bytearray(b"\x01" * len(graph))
+    assert graph.cycles_within(everything) == [[ids[a], ids[b], ids[c]], [ids[d], ids[e]]]
+    without_b = bytearray(everything)
+    without_b[ids[b]] = 0
+    assert graph.cycles_within(without_b) == [[ids[d], ids[e]]]
+    only_c = bytearray(len(graph))
+    only_c[ids[c]] = 1
+    assert graph.cycles_within(only_c) == []
+
+
+def test_deps_views_resolve_paths_lazily():
+    a, b, c = (Path(f"/docs/{name}.md") for name in "abc")
+    graph = DocGraph.from_deps({a: [b, c], b: [c]})
+    forward = ForwardDeps(graph, {a: None, b: None})
+    reverse = ReverseDeps(graph)
+    assert dict(forward) == {a: [b, c], b: [c]}
+    assert dict(reverse) == {b: [a], c: [a, b]}
+    assert c not in forward
+    assert a not in reverse
+    assert reverse.get(a, []) == []
+    assert len(forward) == len(reverse) == 2
@@ -0,0 +1,130 @@
+import re
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from doctrace.core.sources import RepoFiles, SourceIndex, _walk_paths, translate_glob
+
+
+def test_source_index_matches_nested_directories():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/booking/": [doc], "src/": [doc], "src/other/": [doc]})
+    assert index.match("src/booking/handler.ts") == ["src/booking/", "src/"]
+
+
+def test_source_index_exact_and_directory():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/main.py": [doc], "src/": [doc]})
+    assert index.match("src/main.py") == ["src/main.py", "src/"]
+
+
+def test_source_index_ignores_refs_without_trailing_slash():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/booking": [doc]})
+    assert index.match("src/booking/handler.ts") == []
+
+
+def test_source_index_requires_full_component():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/book/": [doc]})
+    assert index.match("src/booking/handler.ts") == []
+
+
+def test_source_index_matches_globs():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/**/*.py": [doc], "src/*.ts": [doc], "*.md": [doc]})
+    assert index.match("src/a/b/c.py") == ["src/**/*.py"]
+    assert index.match("src/c.py") == ["src/**/*.py"]
+    assert index.match("src/a.ts") == ["src/*.ts"]
+    assert index.match("src/a/b.ts") == []
+    assert index.match("README.md") == ["*.md"]
+    assert index.match("docs/README.md") == []
+
+
+def test_source_index_glob_and_directory_order():
+    doc = Path("/docs/a.md")
+    index = SourceIndex({"src/api/": [doc], "src/*/handler.py": [doc], "src/": [doc]})
+    assert index.match("src/api/handler.py") == ["src/api/", "src/*/handler.py", "src/"]
+
+
+def test_translate_glob_component_wildcards():
+    assert re.fullmatch(translate_glob("src/?.py"), "src/a.py")
+    assert not re.fullmatch(translate_glob("src/?.py"), "src/ab.py")
+    assert re.fullmatch(translate_glob("src/[!a]*.py"), "src/b.py")
+    assert not re.fullmatch(translate_glob("src/[!a]*.py"), "src/a.py")
+    assert not re.fullmatch(translate_glob("src/*.py"), "src/a/b.py")
+
+
+def test_repo_files_glob_matches_from_listing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        (tmppath / "src" / "api").mkdir(parents=True)
+        (tmppath / "src" / "api" / "handler.py").write_text("")
+        repo_files = RepoFiles(tmppath)
+        with patch.object(Path, "glob") as mock_glob:
+            assert repo_files.glob_matches("src/**/*.py")
+            assert repo_files.glob_matches("src/**/*.py")
+            mock_glob.assert_not_called()
+        assert repo_files.files == ["src/api/handler.py"]
+
+
+def test_repo_files_glob_falls_back_to_filesystem():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        (tmppath / "src" / "api").mkdir(parents=True)
+        repo_files = RepoFiles(tmppath)
+        assert repo_files.glob_matches("src/a*")
+        assert not repo_files.glob_matches("src/*.py")
+
+
+def test_repo_files_glob_walks_from_literal_prefix():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / "src" / "empty").mkdir(parents=True)
+        (tmppath / "src" / "a.py").write_text("")
+        (tmppath / "build").mkdir()
+        (tmppath / "build" / "out.js").write_text("")
+        (tmppath / ".gitignore").write_text("build/\n")
+        subprocess.run(["git", "init", "-q"], cwd=tmppath, check=True)
+        repo_files = RepoFiles(tmppath)
+        with patch("doctrace.core.sources._walk_paths", wraps=_walk_paths) as mock_walk:
+            with patch.object(Path, "glob") as mock_glob:
+                assert repo_files.glob_matches("src/*.py")
+                assert repo_files.glob_matches("build/*.js")
+                assert repo_files.glob_matches("src/e*/")
+                assert not repo_files.glob_matches("src/a*/")
+                assert not repo_files.glob_matches("build/*.css")
+                assert not repo_files.glob_matches("src/empty/*.py")
+                mock_glob.assert_not_called()
+            assert [call.args[1] for call in mock_walk.call_args_list] == ["build/", "src/"]
+
+
+def test_repo_files_exists_uses_git_listing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / "src" / "api").mkdir(parents=True)
+        (tmppath / "src" / "api" / "handler.py").write_text("")
+        (tmppath / "src" / "old.py").write_text("")
+        subprocess.run(["git", "init", "-q"], cwd=tmppath, check=True)
+        subprocess.run(["git", "add", "."], cwd=tmppath, check=True)
+        (tmppath / "src" / "old.py").unlink()
+        repo_files = RepoFiles(tmppath)
+        with patch.object(Path, "exists") as mock_exists:
+            assert repo_files.exists("src/api/handler.py")
+            assert repo_files.exists("src/api/")
+            assert repo_files.exists("src")
+            mock_exists.assert_not_called()
+        assert not repo_files.exists("src/old.py")
+        assert not repo_files.exists("src/missing.py")
+
+
+def test_repo_files_exists_without_git():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        (tmppath / "docs").mkdir()
+        (tmppath / "docs" / "a.md").write_text("")
+        repo_files = RepoFiles(tmppath)
+        assert repo_files.exists("docs/a.md")
+        assert repo_files.exists("docs/")
+        assert not repo_files.exists("docs/b.md")
@@ -1,7 +1,7 @@
 import tempfile
 from pathlib import Path
 
-from doctrace.commands.preview.graph import build_graph_data, generate_html
+from doctrace.commands.preview.graph import GraphView, build_graph_data, generate_html
 from doctrace.core.config import Config
 
 
@@ -64,14 +64,55 @@ def test_build_graph_data_node_fields():
         assert node["name"] == "test"
 
 
-def test_generate_html_contains_graph_data():
+def test_generate_html_is_a_shell_page():
+    html = generate_html(watch=True)
+    assert "<!DOCTYPE html>" in html
+    assert "__GRAPH_DATA__" not in html
+    assert "fetch('/graph'" in html
+    assert "const watchEnabled = true;" in html
+
+
+def test_graph_view_pages_levels():
     with tempfile.TemporaryDirectory() as tmpdir:
         tmppath = Path(tmpdir).resolve()
         docs_dir = tmppath / "docs"
-        _create_doc(docs_dir / "test.md", sources=["src/test.py"])
-        config = Config({})
-        data = build_graph_data(docs_dir, config, tmppath)
-        html = generate_html(data)
-        assert "<!DOCTYPE html>" in html
-        assert '"nodes"' in html
-        assert '"edges"' in html
+        _create_doc(docs_dir / "a.md")
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md"])
+        _create_doc(docs_dir / "c.md", required_docs=["docs/a.md"])
+        view = GraphView(build_graph_data(docs_dir, Config({}), tmppath))
+        summary = view.summary()
+        assert [level["count"] for level in summary["levels"]] == [1, 2]
+        assert "nodes" not in summary
+
+        first = view.level(1, 0, 1)
+        second = view.level(1, 1, 1)
+        assert first["total"] == second["total"] == 2
+        assert {first["nodes"][0]["name"], second["nodes"][0]["name"]} == {"b", "c"}
+        assert len(first["edges"]) == len(second["edges"]) == 1
+        assert view.level(0)["nodes"][0]["name"] == "a"
+        assert len(view.level(0)["edges"]) == 2
+        assert view.level(5)["nodes"] == []
+
+
+def test_graph_view_around():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md")
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md"])
+        _create_doc(docs_dir / "c.md", required_docs=["docs/b.md"])
+        _create_doc(docs_dir / "d.md")
+        view = GraphView(build_graph_data(docs_dir, Config({}), tmppath))
+
+        def names(payload):
+            return sorted(node["name"] for node in payload["nodes"])
+
+        assert names(view.around("docs/a.md", 1)) == ["a", "b"]
+        assert len(view.around("docs/a.md", 1)["edges"]) == 1
+        assert names(view.around("docs/a.md", 2)) == ["a", "b", "c"]
+        assert len(view.around("docs/a.md", 2)["edges"]) == 2
+        assert names(view.around("docs/d.md", 3)) == ["d"]
+        truncated = view.around("docs/b.md", 1, limit=2)
+        assert len(truncated["nodes"]) == 2
+        assert truncated["truncated"]
+        assert view.around("docs/missing.md") is None
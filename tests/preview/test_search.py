@@ -1,7 +1,7 @@
 import tempfile
 from pathlib import Path
 
-from doctrace.commands.preview.search import search_docs
+from doctrace.commands.preview.search import SearchIndex, search_docs
 
 
 def test_search_docs_finds_match():
@@ -60,3 +60,69 @@ def test_search_docs_returns_line_numbers():
         results = search_docs(tmppath, docs_dir, "keyword")
         assert len(results) == 1
         assert results[0]["matches"][0]["line"] == 3
+
+
+def test_search_index_updates():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "a.md").write_text("# Alpha\n\nshared term")
+        (docs_dir / "b.md").write_text("# Beta\n\nshared term")
+        index = SearchIndex(tmppath, docs_dir)
+        assert sorted(r["name"] for r in index.search("shared term")) == ["a", "b"]
+
+        (docs_dir / "a.md").write_text("# Alpha\n\nrewritten")
+        (docs_dir / "b.md").unlink()
+        (docs_dir / "c.md").write_text("first\nsecond shared\nthird shared\nfourth shared\nfifth shared")
+        index.update([docs_dir / "a.md", docs_dir / "c.md"], [docs_dir / "b.md"])
+
+        assert index.search("shared term") == []
+        assert [r["name"] for r in index.search("rewrit")] == ["a"]
+        results = index.search("SHARED")
+        assert [r["name"] for r in results] == ["c"]
+        assert [m["line"] for m in results[0]["matches"]] == [2, 3, 4]
+
+
+def test_search_index_matches_substrings_inside_tokens():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "a.md").write_text("see build_doc_index() for details")
+        index = SearchIndex(tmppath, docs_dir)
+        assert len(index.search("doc_ind")) == 1
+        assert len(index.search("ld_doc_index() fo")) == 1
+        assert index.search("index for") == []
+
+
+def test_search_index_ranks_title_and_path_hits_first():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "a.md").write_text("# Intro\n\nmentions widget once")
+        (docs_dir / "b.md").write_text("# Intro\n\nwidget\nwidget\nwidget")
+        (docs_dir / "widget-guide.md").write_text("# Guide\n\nnothing here")
+        (docs_dir / "d.md").write_text("---\ntitle: Widget Overview\n---\n\nbody")
+        index = SearchIndex(tmppath, docs_dir)
+        results = index.search("widget")
+        assert [r["name"] for r in results] == ["d", "widget-guide", "b", "a"]
+        assert results[1]["matches"] == []
+
+
+def test_search_index_paginates():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        for i in range(10):
+            (docs_dir / f"doc{i}.md").write_text("term\n" * (1 + i % 3))
+        index = SearchIndex(tmppath, docs_dir)
+        everything = index.search("term", limit=100)
+        assert len(everything) == 10
+        assert [len(r["matches"]) for r in everything] == sorted((len(r["matches"]) for r in everything), reverse=True)
+        pages = [index.search("term", limit=3, offset=offset) for offset in range(0, 10, 3)]
+        assert [r for page in pages for r in page] == everything
+        assert index.search("term", limit=0) == []
+        assert index.search("term", limit=5, offset=20) == []
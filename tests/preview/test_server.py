@@ -0,0 +1,208 @@
+import gzip
+import http.client
+import json
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+from doctrace.commands.preview.graph import GraphView
+from doctrace.commands.preview.search import SearchIndex
+from doctrace.commands.preview.server import PreviewHandler, PreviewServer, _accepts_gzip, _etag_matches
+from doctrace.commands.preview.watch import DocWatcher, LiveGraph
+from doctrace.core.config import Config
+from doctrace.core.git import BlobReader, BulkHistory
+
+
+def _start_server(
+    tmppath: Path,
+    html: bytes,
+    graph_view: GraphView | None = None,
+    live_graph: LiveGraph | None = None,
+    max_workers: int = 2,
+    search_index: SearchIndex | None = None,
+    doc_watcher: DocWatcher | None = None,
+) -> PreviewServer:
+    if search_index is None:
+        search_index = SearchIndex(tmppath, tmppath / "docs")
+
+    def handler(*args, **kwargs):
+        return PreviewHandler(
+            *args,
+            html_content=html,
+            repo_root=tmppath,
+            docs_path=tmppath / "docs",
+            blob_reader=BlobReader(tmppath),
+            bulk_history=BulkHistory(tmppath, "docs"),
+            search_index=search_index,
+            graph_view=graph_view,
+            live_graph=live_graph,
+            doc_watcher=doc_watcher,
+            **kwargs,
+        )
+
+    server = PreviewServer(("127.0.0.1", 0), handler, max_workers=max_workers, max_streams=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_accepts_gzip():
+    assert _accepts_gzip("gzip, deflate, br")
+    assert _accepts_gzip("*")
+    assert not _accepts_gzip("deflate")
+    assert not _accepts_gzip("gzip;q=0")
+
+
+def test_etag_matches():
+    assert _etag_matches('W/"abc"', 'W/"abc"')
+    assert _etag_matches('"x", "abc"', 'W/"abc"')
+    assert _etag_matches("*", 'W/"abc"')
+    assert not _etag_matches(None, 'W/"abc"')
+    assert not _etag_matches('"abd"', 'W/"abc"')
+
+
+def test_preview_server_keep_alive_gzip_and_etag():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / "docs").mkdir()
+        (tmppath / "docs" / "a.md").write_text("# A\n")
+        html = b"<html>" + b"graph " * 1000 + b"</html>"
+        server = _start_server(tmppath, html)
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+            conn.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            body = response.read()
+            etag = response.getheader("ETag")
+            assert response.getheader("Content-Encoding") == "gzip"
+            assert gzip.decompress(body) == html
+
+            conn.request("GET", "/", headers={"If-None-Match": etag})
+            response = conn.getresponse()
+            assert response.status == 304
+            assert response.read() == b""
+
+            conn.request("GET", "/doc?path=docs/a.md")
+            response = conn.getresponse()
+            assert response.status == 200
+            assert response.getheader("Content-Encoding") is None
+            assert response.read() == b"# A\n"
+            assert conn.sock is not None
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_preview_server_graph_api():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / "docs").mkdir()
+        graph_data = {
+            "nodes": [
+                {"id": "N0", "path": "docs/a.md", "name": "a", "level": 0},
+                {"id": "N1", "path": "docs/b.md", "name": "b", "level": 1},
+            ],
+            "edges": [{"from": "N0", "to": "N1"}],
+            "levels": [{"level": 0, "count": 1, "label": "Level 0"}, {"level": 1, "count": 1, "label": "Level 1"}],
+            "stats": {"total": 2, "level_0": 1, "circular": 0, "max_depth": 1},
+        }
+        server = _start_server(tmppath, b"<html></html>", GraphView(graph_data))
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+
+            def get(path):
+                conn.request("GET", path)
+                response = conn.getresponse()
+                return response.status, response.read()
+
+            status, body = get("/graph")
+            assert status == 200
+            assert json.loads(body) == {"levels": graph_data["levels"], "stats": graph_data["stats"], "version": 0}
+            status, body = get("/graph?level=1")
+            assert [node["id"] for node in json.loads(body)["nodes"]] == ["N1"]
+            assert json.loads(body)["edges"] == graph_data["edges"]
+            status, body = get("/graph?around=docs/b.md&depth=1")
+            assert sorted(node["id"] for node in json.loads(body)["nodes"]) == ["N0", "N1"]
+            status, body = get("/graph?around=docs/missing.md")
+            assert status == 404
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_preview_server_limits_requests_not_connections():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / "docs").mkdir()
+        (tmppath / "docs" / "a.md").write_text("# A\n")
+        live = LiveGraph(tmppath / "docs", Config({}), tmppath)
+        server = _start_server(tmppath, b"<html></html>", live_graph=live, max_workers=1)
+        port = server.server_address[1]
+        try:
+            idle = http.client.HTTPConnection("127.0.0.1", port)
+            idle.request("GET", "/")
+            assert idle.getresponse().read() == b"<html></html>"
+
+            fresh = http.client.HTTPConnection("127.0.0.1", port)
+            fresh.request("GET", "/")
+            assert fresh.getresponse().read() == b"<html></html>"
+
+            server.workers.acquire()
+            with patch("doctrace.commands.preview.server.PREVIEW_BUSY_TIMEOUT", 0.05):
+                fresh.request("GET", "/")
+                response = fresh.getresponse()
+                assert response.status == 503
+                assert response.getheader("Retry-After") == "1"
+                response.read()
+            server.workers.release()
+            fresh.close()
+
+            idle.request("GET", "/events")
+            assert idle.getresponse().status == 200
+
+            other = http.client.HTTPConnection("127.0.0.1", port)
+            other.request("GET", "/")
+            assert other.getresponse().read() == b"<html></html>"
+            other.request("GET", "/events")
+            response = other.getresponse()
+            assert response.status == 503
+            response.read()
+            other.close()
+            idle.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_preview_server_refreshes_search_without_watch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        docs_dir.mkdir()
+        (docs_dir / "a.md").write_text("# A\nalpha\n")
+        search_index = SearchIndex(tmppath, docs_dir)
+        watcher = DocWatcher(docs_dir, interval=0)
+        watcher.listeners.append(search_index.update)
+        server = _start_server(tmppath, b"<html></html>", search_index=search_index, doc_watcher=watcher)
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+
+            def search(query):
+                conn.request("GET", f"/search?q={query}")
+                return [result["path"] for result in json.loads(conn.getresponse().read())]
+
+            conn.request("POST", "/doc?path=docs/a.md", body=b"# A\nbravo\n")
+            assert conn.getresponse().read() == b'{"ok":true}'
+            assert search("bravo") == ["docs/a.md"]
+            watcher.refresher.join()
+
+            (docs_dir / "b.md").write_text("# B\ncharlie\n")
+            search("charlie")
+            watcher.refresher.join()
+            assert search("charlie") == ["docs/b.md"]
+            conn.close()
+        finally:
+            server.shutdown()
+            server.server_close()
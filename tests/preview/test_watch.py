@@ -0,0 +1,154 @@
+import tempfile
+from pathlib import Path
+
+from doctrace.commands.preview.graph import build_graph_data
+from doctrace.commands.preview.watch import DocWatcher, LiveGraph, diff_snapshots, snapshot_docs
+from doctrace.core.config import Config
+
+
+def _create_doc(path: Path, required_docs: list[str] = None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    content = "---\n"
+    if required_docs:
+        content += "required_docs:\n"
+        for doc in required_docs:
+            content += f"  - {doc}: desc\n"
+    content += "---\n\n# Test\n"
+    path.write_text(content)
+
+
+def _graph_by_path(data: dict) -> tuple:
+    paths = {node["id"]: node["path"] for node in data["nodes"]}
+    nodes = sorted((node["path"], node["level"]) for node in data["nodes"])
+    edges = sorted((paths[edge["from"]], paths[edge["to"]], edge.get("circular", False)) for edge in data["edges"])
+    return nodes, edges, data["levels"], data["stats"]
+
+
+def test_diff_snapshots():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        docs_dir = Path(tmpdir).resolve() / "docs"
+        _create_doc(docs_dir / "a.md")
+        _create_doc(docs_dir / "b.md")
+        old = snapshot_docs(docs_dir)
+        _create_doc(docs_dir / "a.md", required_docs=["docs/b.md"])
+        (docs_dir / "b.md").unlink()
+        _create_doc(docs_dir / "c.md")
+        changed, removed = diff_snapshots(old, snapshot_docs(docs_dir))
+        assert sorted(changed) == [docs_dir / "a.md", docs_dir / "c.md"]
+        assert removed == [docs_dir / "b.md"]
+
+
+def test_live_graph_applies_incremental_deltas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md")
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md"])
+        config = Config({})
+        live = LiveGraph(docs_dir, config, tmppath)
+        a_id = live.node_ids[docs_dir / "a.md"]
+
+        _create_doc(docs_dir / "c.md", required_docs=["docs/b.md"])
+        delta = live.apply([docs_dir / "c.md"], [])
+        assert delta["version"] == 1
+        assert [node["path"] for node in delta["nodes"]["added"]] == ["docs/c.md"]
+        assert len(delta["edges"]["added"]) == 1
+        assert _graph_by_path(live.graph_data) == _graph_by_path(build_graph_data(docs_dir, config, tmppath))
+
+        (docs_dir / "a.md").unlink()
+        delta = live.apply([], [docs_dir / "a.md"])
+        assert delta["nodes"]["removed"] == [a_id]
+        assert _graph_by_path(live.graph_data) == _graph_by_path(build_graph_data(docs_dir, config, tmppath))
+
+        assert live.apply([docs_dir / "b.md"], []) is None
+        assert live.version == 2
+
+
+def test_live_graph_wait_events():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md")
+        watcher = DocWatcher(docs_dir)
+        live = LiveGraph(docs_dir, Config({}), tmppath)
+        watcher.listeners.append(live.apply)
+        assert live.wait_events(0, timeout=0) == []
+
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md"])
+        assert watcher.poll() == ([docs_dir / "b.md"], [])
+        events = live.wait_events(0, timeout=0)
+        assert [(name, payload["version"]) for name, payload in events] == [("delta", 1)]
+
+        live.deltas.clear()
+        events = live.wait_events(0, timeout=0)
+        assert events[0][0] == "snapshot"
+        assert events[0][1]["version"] == 1
+        assert events[0][1]["stats"]["total"] == 2
+        assert live.view.level(1)["nodes"][0]["name"] == "b"
+
+
+def test_live_graph_propagates_level_changes_to_dependents():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        docs_dir = tmppath / "docs"
+        _create_doc(docs_dir / "a.md")
+        _create_doc(docs_dir / "b.md")
+        _create_doc(docs_dir / "c.md", required_docs=["docs/b.md"])
+        _create_doc(docs_dir / "d.md", required_docs=["docs/c.md"])
+        config = Config({})
+        live = LiveGraph(docs_dir, config, tmppath)
+
+        _create_doc(docs_dir / "b.md", required_docs=["docs/a.md"])
+        delta = live.apply([docs_dir / "b.md"], [])
+        assert sorted((node["path"], node["level"]) for node in delta["nodes"]["updated"]) == [
+            ("docs/b.md", 1),
+            ("docs/c.md", 2),
+            ("docs/d.md", 3),
+        ]
+        assert _graph_by_path(live.graph_data) == _graph_by_path(build_graph_data(docs_dir, config, tmppath))
+
+        _create_doc(docs_dir / "a.md", required_docs=["docs/d.md"])
+        live.apply([docs_dir / "a.md"], [])
+        assert live.cyclic
+        assert live.graph_data["stats"] == build_graph_data(docs_dir, config, tmppath)["stats"]
+
+        _create_doc(docs_dir / "a.md")
+        (docs_dir / "c.md").unlink()
+        live.apply([docs_dir / "a.md"], [docs_dir / "c.md"])
+        assert _graph_by_path(live.graph_data) == _graph_by_path(build_graph_data(docs_dir, config, tmppath))
+
+
+def test_doc_watcher_isolates_failing_listeners(capsys):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        docs_dir = Path(tmpdir).resolve() / "docs"
+        _create_doc(docs_dir / "a.md")
+        watcher = DocWatcher(docs_dir)
+        calls = []
+
+        def failing(changed, removed):
+            raise ValueError("boom")
+
+        watcher.listeners.extend([failing, lambda changed, removed: calls.append(changed)])
+        _create_doc(docs_dir / "b.md")
+        watcher.poll()
+        assert calls == [[docs_dir / "b.md"]]
+        assert "boom" in capsys.readouterr().err
+
+
+def test_doc_watcher_refresh_is_throttled():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        docs_dir = Path(tmpdir).resolve() / "docs"
+        _create_doc(docs_dir / "a.md")
+        watcher = DocWatcher(docs_dir, interval=3600)
+        calls = []
+        watcher.listeners.append(lambda changed, removed: calls.append(changed))
+        _create_doc(docs_dir / "b.md")
+        watcher.refresh()
+        assert calls == []
+        watcher.interval = 0
+        with watcher.lock:
+            watcher.refresh()
+        assert watcher.refresher is None
+        watcher.refresh()
+        watcher.refresher.join()
+        assert calls == [[docs_dir / "b.md"]]
@@ -0,0 +1,54 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from doctrace.commands.info import run
+
+DOCS_DIR = Path(__file__).parent / "docs"
+
+
+def test_info_lists_only_checked_docs(capsys, monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir).resolve()
+        (tmppath / ".git").mkdir()
+        docs_dir = tmppath / "docs"
+        shutil.copytree(DOCS_DIR, docs_dir)
+        monkeypatch.chdir(tmppath)
+
+        assert run(docs_dir, output_json=True, ignore_patterns=["docs/skip/*"]) == 1
+        data = json.loads(capsys.readouterr().out)
+        assert data["summary"]["max_level"] == 2
+        assert data["summary"]["circular_count"] == 0
+        assert "cycles" not in data
+        assert sorted(doc["path"] for docs in data["levels"].values() for doc in docs) == ["docs/a.md", "docs/b.md"]
+
+        assert run(docs_dir, output_json=True) == 1
+        summary = json.loads(capsys.readouterr().out)["summary"]
+        assert summary["max_level"] == 2
+        assert summary["circular_count"] == 1
+
+        (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/skip/x.md: desc\n---\n\n# B\n")
+        (docs_dir / "skip" / "y.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\n# Y\n")
+        assert run(docs_dir, output_json=True, ignore_patterns=["docs/skip/*"]) == 1
+        data = json.loads(capsys.readouterr().out)
+        assert data["summary"]["circular_count"] == 0
+        assert "cycles" not in data
+
+        (docs_dir / "b.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\n# B\n")
+        assert run(docs_dir, ignore_patterns=["docs/skip/*"]) == 1
+        out = capsys.readouterr().out
+        assert "  docs/a.md\n    <-> docs/b.md\n" in out
+        assert "Circular deps (required): 1\n" in out
+
+        (docs_dir / "a.md").write_text("---\nrequired_docs:\n  - docs/b.md: desc\n  - docs/c.md: desc\n---\n\n# A\n")
+        (docs_dir / "c.md").write_text("---\nrequired_docs:\n  - docs/a.md: desc\n---\n\n# C\n")
+        assert run(docs_dir, output_json=True, ignore_patterns=["docs/skip/*"]) == 1
+        summary = json.loads(capsys.readouterr().out)["summary"]
+        assert summary["circular_count"] == 2
+        assert summary["cycle_count"] == 1
+        assert run(docs_dir, ignore_patterns=["docs/skip/*"]) == 1
+        out = capsys.readouterr().out
+        assert "  cycle among: docs/a.md, docs/b.md, docs/c.md\n" in out
+        assert "<->" not in out
+        assert "Circular deps (required): 1\n" in out